@@ -1,14 +1,21 @@
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
-import base64
 import html
-import urllib.parse
+from inventario.assets import image_aspect, image_src
+from inventario.datasource import COMPUTO, TELEFONOS, summary_override
+from inventario.refresh import get_refresher, render_freshness
+from inventario.facets import count, get_facet_index, intersect
+from inventario.changes import render_changes
+from inventario.charts import crear_dona
+from inventario.figures import render_figure_stats
+from inventario.grid import render_paged_grid
+from inventario.schema import render_schema_report, resolve_schema, search_fields
+from inventario.search import search_help, search_rows
+from inventario.summary import get_summary
+from inventario.timing import finish_rerun, fragment_run, payload_bytes, stage, start_rerun
 
 st.set_page_config(page_title="Equipos de computo", layout="wide")
+start_rerun("app.py")
 
 st.markdown("""
 <style> 
@@ -34,21 +41,29 @@ st.markdown("""
 div[data-testid="stButton"] > button:hover {
     background-color: #0056b3;
 }
-    .map-button-link {
-        display: block;
-        text-decoration: none;
-        transition: transform 0.2s ease-in-out, box-shadow 0.2s ease-in-out;
-        border-radius: 9px;
+    div[class*="st-key-mapa_"] button {
+        position: relative;
+        height: auto !important;
+        padding: 0 !important;
+        background-color: transparent !important;
+        background-size: 100% 100%;
+        border-radius: 8px !important;
         margin-bottom: 15px;
+        transition: transform 0.2s ease-in-out, box-shadow 0.2s ease-in-out;
     }
-    .map-button-link:hover {
+    div[class*="st-key-mapa_"] button:hover {
         transform: scale(1.03);
         box-shadow: 0px 0px 15px rgba(0, 166, 255, 0.7);
     }
-    .map-button-link img {
-        width: 100%;
-        border-radius: 8px;
-        display: block;
+    div[class*="st-key-mapa_"] button[data-testid="stBaseButton-primary"] {
+        box-shadow: 0px 0px 0px 3px #00A6FF;
+    }
+    div[class*="st-key-mapa_"] button div[data-testid="stMarkdownContainer"] {
+        position: absolute; top: 6px; right: 6px;
+    }
+    div[class*="st-key-mapa_"] button p {
+        min-width: 24px; padding: 1px 7px;
+        border-radius: 12px; background-color: #00A6FF; color: white; font-size: 12px; font-weight: bold; text-align: center;
     }
 </style>
 
@@ -65,55 +80,63 @@ with menu2:
         st.switch_page("pages/Tel.py")
 
 
-SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1WSxtSCoKAZxXjuUKSN_YxuIBa9uEQtWYGRsK_UcWYMA/edit?gid=0#gid=0"
-SHEET_GRAPH = "Web"
-SHEET_TABLE = "Equipos"
-
-@st.cache_data(ttl=1000)
 def load_data():
     try:
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive.readonly"]
-        creds_dict = st.secrets["gcp_service_account"]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-
-        client = gspread.authorize(creds)
-        
-        spreadsheet = client.open_by_url(SPREADSHEET_URL)
-        df_graph = pd.DataFrame(spreadsheet.worksheet(SHEET_GRAPH).get_all_records())
-        df_table = pd.DataFrame(spreadsheet.worksheet(SHEET_TABLE).get_all_records())
-        df_table = df_table.fillna("").astype(str)
-        
-        return df_graph, df_table
+        snapshot = get_refresher(COMPUTO.key).get()
+        frames = snapshot.frames
+        return frames.get("graph", pd.DataFrame()), frames["table"], frames["table_keys"], snapshot.version
     except Exception as e:
-        st.error(f"Error al conectar con Google Sheets: {e}")
-        return pd.DataFrame(), pd.DataFrame()
+        st.error(f"Error al cargar el inventario: {e}")
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), ""
 
-def img_to_base64(image_path):
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except FileNotFoundError:
-        return None
-    
 if "page" not in st.session_state:
     st.session_state.page = "inventario"
 
 
-df_graph, df_table = load_data()
+with stage("carga") as s:
+    df_graph, df_table, df_table_keys, data_version = load_data()
+    s.rows_out = len(df_table)
+render_freshness(get_refresher(COMPUTO.key))
 
 params = st.query_params
 if "estado" in params:
     st.session_state.filtro_estado = params.get("estado")
 elif params.get("clear"):
     st.session_state.filtro_estado = None
-    st.query_params.clear()
+    del st.query_params["clear"]
 else:
     if "filtro_estado" not in st.session_state:
         st.session_state.filtro_estado = None
+    elif st.session_state.filtro_estado:
+        st.query_params["estado"] = st.session_state.filtro_estado
 
 if "filtro_activo" not in st.session_state:
     st.session_state.filtro_activo = None
 
+def toggle_estatus(estatus):
+    st.session_state.filtro_activo = None if st.session_state.filtro_activo == estatus else estatus
+
+def toggle_estado(estado):
+    """Filtro de Estado desde el mapa, sin recargar la página; `?estado=` queda como enlace directo."""
+    if st.session_state.filtro_estado == estado:
+        st.session_state.filtro_estado = None
+        st.query_params.pop("estado", None)
+    else:
+        st.session_state.filtro_estado = estado
+        st.query_params["estado"] = estado
+
+with stage("facetas", rows_in=len(df_table)):
+    schema = resolve_schema(COMPUTO.key, tuple(df_table.columns))
+    col_estatus = schema.get("ESTATUS")
+    col_estado = schema.get("ESTADO")
+    campos = search_fields(COMPUTO.key, schema)
+    facets = get_facet_index(data_version, tuple(c for c in (col_estatus, col_estado) if c), df_table, df_table_keys)
+filtros = {}
+if col_estatus:
+    filtros[col_estatus] = st.session_state.filtro_activo
+if col_estado:
+    filtros[col_estado] = st.session_state.filtro_estado
+
 col1, col2 = st.columns([1, 2])
 
 with col1:
@@ -125,20 +148,21 @@ with col1:
     ]
 
     c_left, c_right = st.columns(2)
-    
-    for i, (path, estado) in enumerate(image_state_map):
-        b64 = img_to_base64(path)
-        if b64:
-            estado_encoded = urllib.parse.quote(estado)
-            html_button = f"""
-            <a href="?estado={estado_encoded}" target="_self" class="map-button-link">
-                <img src="data:image/png;base64,{b64}" alt="Filtro para {html.escape(estado)}">
-            </a>
-            """
-            if i < 3:
-                c_left.markdown(html_button, unsafe_allow_html=True)
-            else:
-                c_right.markdown(html_button, unsafe_allow_html=True)
+    with stage("mapa") as s:
+        conteo_estados = facets.counts_excluding(col_estado, filtros)
+
+        estilos = ""
+        for i, (path, estado) in enumerate(image_state_map):
+            src = image_src(path)
+            if src:
+                estilos += f'.st-key-mapa_{i} button {{ background-image: url("{src}"); aspect-ratio: {image_aspect(path):.3f}; }}\n'
+                (c_left if i < 3 else c_right).button(
+                    f"{count(conteo_estados, estado)}", key=f"mapa_{i}", help=f"Filtro para {estado}",
+                    type="primary" if st.session_state.filtro_estado == estado else "secondary",
+                    on_click=toggle_estado, args=(estado,), use_container_width=True
+                )
+        st.markdown(f"<style>{estilos}</style>", unsafe_allow_html=True)
+        s.bytes = len(estilos)
 
 if st.session_state.filtro_estado:
     col_texto, col_boton = st.columns([.2, .8], gap="small")
@@ -151,28 +175,21 @@ if st.session_state.filtro_estado:
         """, unsafe_allow_html=True)
     
     with col_boton:
-        if st.button("Eliminar filtro", key="clear_estado"):
-            st.session_state.filtro_estado = None
-            st.query_params.clear()
-            st.rerun()
+        st.button("Eliminar filtro", key="clear_estado", on_click=toggle_estado, args=(st.session_state.filtro_estado,))
 
 with col2:
-    if not df_graph.empty:
+    if col_estatus:
         try:
-            df_graph.columns = df_graph.columns.str.strip()
-            if "Etiqueta" in df_graph.columns and "Equipos" in df_graph.columns:
-                conteo = df_graph.groupby("Etiqueta")["Equipos"].sum().reset_index()
-                fig = px.pie(
-                    conteo, names="Etiqueta", values="Equipos", hole=0.50,
-                    color_discrete_sequence=["#3BB5D4", "#003F7D", "#00A6FF", "#DFFC9D", "#385368", "#97D4DA", "#E68E8E", "#D85959"]
-                )
-                fig.update_traces(textinfo="percent+label", textfont_size=14, marker=dict(line=dict(color="#0E1117", width=2)))
-                fig.update_layout(
-                    margin=dict(t=30, b=40, l=100, r=0), paper_bgcolor="#0E1117", plot_bgcolor="#0E1117", font=dict(color="white"),
-                    legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1, font=dict(color="white", size=14))
-                )
-                fig.update_yaxes(scaleanchor="x", scaleratio=1)
-                st.plotly_chart(fig, use_container_width=True)
+            with stage("grafico", rows_in=len(df_table)) as s:
+                conteo = get_summary(data_version, (col_estatus,), df_table, df_table_keys).frame(col_estatus)
+                df_graph = df_graph.rename(columns=lambda c: str(c).strip())
+                if summary_override() and "Etiqueta" in df_graph.columns and "Equipos" in df_graph.columns:
+                    conteo = df_graph.groupby("Etiqueta")["Equipos"].sum().reset_index()
+                if not conteo.empty:
+                    fig = crear_dona(conteo)
+                    if s.measure:
+                        s.bytes = payload_bytes(fig)
+                    st.plotly_chart(fig, use_container_width=True)
                 total = int(conteo["Equipos"].sum())
                 st.markdown(f"<div class='metric-box'>Total de equipos: {total}</div>", unsafe_allow_html=True)
         except Exception as e:
@@ -182,51 +199,38 @@ st.markdown("### ")
 estatus_list = ["ACTIVA", "DISPONIBLE", "OBSOLETA", "VENTA/DONAR", "VENDIDA", "DAÑADA", "BAJA", "ROBO"]
 
 col_btns = st.columns(len(estatus_list))
+conteo_estatus = facets.counts_excluding(col_estatus, filtros)
 for i, estatus in enumerate(estatus_list):
-    if col_btns[i].button(estatus, key=f"btn_{estatus}", use_container_width=True):
-        st.session_state.filtro_activo = None if st.session_state.filtro_activo == estatus else estatus
-
-search_query = st.text_input("🔍 Buscar", placeholder="Escribe aquí para buscar...")
-
-df_filtrado = df_table.copy()
-
-if st.session_state.filtro_activo and "ESTATUS" in df_filtrado.columns:
-    df_filtrado = df_filtrado[df_filtrado["ESTATUS"].str.upper() == st.session_state.filtro_activo]
-
-if st.session_state.filtro_estado and "ESTADO" in df_filtrado.columns:
-    df_filtrado = df_filtrado[df_filtrado["ESTADO"].str.upper() == st.session_state.filtro_estado.upper()]
-
-if "IMAGEN" in df_filtrado.columns:
-    df_filtrado = df_filtrado.drop(columns=["IMAGEN"])
-    
-if "*" in df_filtrado.columns:
-    df_filtrado = df_filtrado.drop(columns=["*"])
-
-if "" in df_filtrado.columns:
-    df_filtrado = df_filtrado.drop(columns=[""])
-
-if search_query:
-    search_series = df_filtrado.apply(lambda row: " ".join(row.values.astype(str)), axis=1)
-    mask = search_series.str.contains(search_query, case=False, na=False)
-    df_filtrado = df_filtrado[mask]
-
-gb = GridOptionsBuilder.from_dataframe(df_filtrado)
-gb.configure_default_column(editable=False, resizable=False, minWidth=80)
-gb.configure_selection(selection_mode="single", use_checkbox=False)
-gb.configure_grid_options(domLayout="normal", suppressHorizontalScroll=False, rowHeight=30)
-gridOptions = gb.build()
-
-custom_css = {
-    ".ag-root-wrapper": {"background-color": "transparent !important", "border": "1px solid #333e5d !important"},
-    ".ag-header, .ag-row, .ag-cell": {"background-color": "transparent !important", "color": "white !important", "border": "1px solid #333e5d !important", "font-size": "11px !important"},
-    ".ag-header-cell-text": {"color": "white !important", "font-weight": "bold !important"}
-}
-
-AgGrid(
-    df_filtrado, gridOptions=gridOptions, update_mode=GridUpdateMode.MODEL_CHANGED,
-    fit_columns_on_grid_load=False, allow_unsafe_jscode=False, theme="streamlit", height=700,
-    data_return_mode=DataReturnMode.FILTERED_AND_SORTED,
-    key=f"tabla_equipos_{st.session_state.filtro_activo}_{st.session_state.filtro_estado}",
-    custom_css=custom_css
-
-)
+    col_btns[i].button(
+        f"{estatus} ({count(conteo_estatus, estatus)})", key=f"btn_{estatus}", use_container_width=True,
+        on_click=toggle_estatus, args=(estatus,)
+    )
+
+@st.fragment
+def seccion_tabla(df_table, facets, filtros, campos, data_version):
+    """Búsqueda y tabla: escribir, ordenar o paginar solo vuelve a ejecutar esta sección."""
+    with fragment_run("app.py#tabla"):
+        search_query = st.text_input("🔍 Buscar", placeholder="Escribe aquí para buscar...", help=search_help(campos))
+
+        columnas_tabla = [c for c in df_table.columns if c not in ("IMAGEN", "*", "")]
+        with stage("filtro", rows_in=len(df_table)) as s:
+            posiciones = facets.select(filtros)
+            s.rows_out = len(df_table) if posiciones is None else len(posiciones)
+
+        if search_query:
+            with stage("busqueda", rows_in=s.rows_out) as s:
+                posiciones = intersect(posiciones, search_rows("app", data_version, columnas_tabla, df_table, search_query, campos))
+                s.rows_out = len(posiciones)
+
+        render_paged_grid(
+            df_table, posiciones, columnas_tabla, data_version, key="tabla_equipos", export_name="equipos_computo",
+            grid_key=f"tabla_equipos_{filtros.get(col_estatus)}_{filtros.get(col_estado)}"
+        )
+
+seccion_tabla(df_table, facets, filtros, campos, data_version)
+render_changes(get_refresher(COMPUTO.key).changes, "computo", col_estatus)
+
+render_figure_stats()
+render_schema_report(schema)
+finish_rerun()
+get_refresher(TELEFONOS.key).prefetch()
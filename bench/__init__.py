@@ -0,0 +1 @@
+"""Benchmarks de las páginas con datos sintéticos: `python -m bench.run_benchmarks`."""
@@ -0,0 +1,269 @@
+"""Prueba de carga: N sesiones simultáneas contra un servidor local de Streamlit.
+
+Levanta `streamlit run app.py` sobre un espejo local en CSV generado con
+`bench.synthetic` (no se toca Google Sheets) y abre N websockets que hablan el
+protocolo del navegador, como `bench.rerun_latency`. Cada sesión repite
+interacciones al azar: botones de ESTATUS, mosaicos del mapa, búsquedas y
+cambios de página (en Tel.py, filtros de faceta y búsquedas). Las búsquedas y
+facetas se envían como rerun del fragmento de la tabla, igual que el navegador.
+
+    python -m bench.load_test --sessions 1 2 4 8 --interactions 20 --rows 10000
+
+Por cada nivel de concurrencia muestra p50/p95/p99 por interacción (hasta
+`script_finished`), las interacciones por segundo y el RSS del servidor.
+`AppTest` no sirve aquí: su Runtime simulado es global y no admite varias
+instancias corriendo a la vez.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from streamlit.proto.ClientState_pb2 import ClientState
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+from bench.rerun_latency import rerun
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ESTATUS = ["ACTIVA", "DISPONIBLE", "OBSOLETA", "VENTA/DONAR", "VENDIDA", "DAÑADA", "BAJA", "ROBO"]
+BUSQUEDAS = ["perez", "latitude", "iphone 13", "samsung", "garcia l", "thinkpad", "serie:sn1", "imei:35"]
+INTERACCIONES = {
+    "app": ["estatus", "mapa", "busqueda", "pagina"],
+    "Tel": ["faceta", "busqueda", "pagina"],
+}
+
+
+def write_mirror(path, rows, seed):
+    """Escribe ambos libros sintéticos como espejo local en CSV."""
+    from bench.synthetic import make_equipos, make_hoja1, make_web_computo, make_web_telefonos
+    from inventario.datasource import COMPUTO, TELEFONOS, CsvSource
+
+    source = CsvSource(path)
+    equipos = make_equipos(rows, seed)
+    hoja1 = make_hoja1(rows, seed)
+    source.write_dataset(COMPUTO, {"table": equipos, "graph": make_web_computo(equipos)})
+    source.write_dataset(TELEFONOS, {"table": hoja1, "gauges": make_web_telefonos(hoja1)})
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, data_dir, log_path, timeout=120):
+    """Arranca `streamlit run app.py` con el espejo y espera a que responda."""
+    env = dict(os.environ, INVENTARIO_BACKEND="csv", INVENTARIO_DATA_PATH=data_dir, INVENTARIO_SNAPSHOT_DIR="")
+    log = open(log_path, "wb")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.port", str(port),
+         "--server.headless", "true", "--browser.gatherUsageStats", "false"],
+        cwd=ROOT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"el servidor terminó con código {server.returncode}; ver {log_path}")
+        try:
+            urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1).read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"el servidor no respondió en {timeout} s; ver {log_path}")
+
+
+def server_memory(pid):
+    """(RSS, pico de RSS) del servidor en bytes, según /proc/<pid>/status."""
+    memoria = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                nombre, valor, _ = line.split()
+                memoria[nombre] = int(valor) * 1024
+    return memoria.get("VmRSS:", 0), memoria.get("VmHWM:", 0)
+
+
+class Session:
+    """Una sesión simulada: su websocket, su página y los valores de sus widgets.
+
+    Como el navegador, cada rerun lleva el valor actual de todos los widgets
+    que la sesión ha tocado; los botones van como `trigger_value` solo en el
+    rerun del clic.
+    """
+
+    def __init__(self, port, seed, timeout):
+        self.port, self.timeout = port, timeout
+        self.rng = random.Random(seed)
+        self.page = "app"
+        self.values = {}
+        self.found = {}
+
+    async def open(self):
+        self.ws = await websocket_connect(f"ws://localhost:{self.port}/_stcore/stream", subprotocols=["streamlit"])
+        segundos, self.found = await rerun(self.ws, ClientState(), self.timeout)
+        self.pages = self.found["pages"]
+        return segundos
+
+    async def _rerun(self, trigger=None, fragment=False):
+        state = ClientState(page_script_hash=self.pages[self.page])
+        if fragment and self.found["fragments"]:
+            state.fragment_id = next(iter(self.found["fragments"]))
+        state.widget_states.widgets.extend(self.values.values())
+        if trigger is not None:
+            state.widget_states.widgets.append(WidgetState(id=trigger, trigger_value=True))
+        segundos, found = await rerun(self.ws, state, self.timeout)
+        if fragment:
+            # El fragmento se vuelve a dibujar completo: sus widgets anteriores dejan de existir.
+            anteriores = self.found["in_fragment"]
+            for nombre in ("buttons", "selectboxes"):
+                self.found[nombre] = {
+                    i: v for i, v in self.found[nombre].items() if i not in anteriores
+                } | found[nombre]
+            self.found["search"] = found["search"] or self.found["search"]
+            self.found["in_fragment"] = found["in_fragment"]
+        else:
+            self.found = found
+        # Como el navegador, se olvida el valor de un widget cuyo id ya no aparece (p. ej. si cambió su etiqueta).
+        vigentes = {found["search"], *found["selectboxes"]}
+        self.values = {i: v for i, v in self.values.items() if i in vigentes}
+        return segundos
+
+    def _button(self, suffix):
+        return next((i for i in self.found["buttons"] if i.endswith(suffix)), None)
+
+    async def step(self):
+        """Hace una interacción al azar; devuelve (nombre, segundos)."""
+        rng = self.rng
+        accion = rng.choice(INTERACCIONES[self.page])
+        nombre = f"{self.page}:{accion}"
+        if accion == "estatus":
+            return nombre, await self._rerun(trigger=self._button(f"btn_{rng.choice(ESTATUS)}"))
+        if accion == "mapa":
+            return nombre, await self._rerun(trigger=self._button(f"mapa_{rng.randrange(6)}"))
+        if accion == "busqueda":
+            search = self.found["search"]
+            self.values[search] = WidgetState(id=search, string_value=rng.choice(BUSQUEDAS + [""]))
+            return nombre, await self._rerun(fragment=True)
+        if accion == "faceta":
+            facetas = [i for i in self.found["selectboxes"] if "faceta_" in i]
+            if facetas:
+                faceta = rng.choice(facetas)
+                opcion = rng.choice(self.found["selectboxes"][faceta][:6])
+                self.values[faceta] = WidgetState(id=faceta, string_value=opcion)
+            return nombre, await self._rerun(fragment=True)
+        self.page = "Tel" if self.page == "app" else "app"
+        self.values = {}
+        return nombre, await self._rerun()
+
+    def close(self):
+        self.ws.close()
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(len(values) * q)) - 1))]
+
+
+def _resumen(values):
+    return {"n": len(values), "p50_s": statistics.median(values),
+            "p95_s": _percentile(values, 0.95), "p99_s": _percentile(values, 0.99)}
+
+
+async def run_level(port, pid, sessions, interactions, seed, timeout):
+    """Corre `sessions` sesiones a la vez, cada una con `interactions` interacciones."""
+    tiempos = {}
+
+    async def worker(i):
+        session = Session(port, seed * 1000 + i, timeout)
+        tiempos.setdefault("abrir", []).append(await session.open())
+        try:
+            for _ in range(interactions):
+                nombre, segundos = await session.step()
+                tiempos.setdefault(nombre, []).append(segundos)
+        finally:
+            session.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(sessions)))
+    wall = time.perf_counter() - start
+
+    interacciones = [s for nombre, v in tiempos.items() if nombre != "abrir" for s in v]
+    rss, rss_pico = server_memory(pid)
+    return {
+        "sessions": sessions,
+        "interactions": len(interacciones),
+        "wall_s": wall,
+        "throughput": len(interacciones) / wall,
+        "rss_bytes": rss,
+        "rss_peak_bytes": rss_pico,
+        **{k: v for k, v in _resumen(interacciones).items() if k != "n"},
+        "por_interaccion": {nombre: _resumen(v) for nombre, v in sorted(tiempos.items())},
+    }
+
+
+async def run(port, pid, args):
+    warmup = Session(port, args.seed, args.timeout)
+    await warmup.open()
+    for page in warmup.pages:
+        warmup.page = page
+        await warmup._rerun()
+    warmup.close()
+
+    niveles = []
+    for sessions in args.sessions:
+        nivel = await run_level(port, pid, sessions, args.interactions, args.seed, args.timeout)
+        niveles.append(nivel)
+        print(f"{sessions:>3} sesiones: {nivel['throughput']:6.1f} interacciones/s   "
+              f"p50 {nivel['p50_s'] * 1000:7.1f} ms   p95 {nivel['p95_s'] * 1000:7.1f} ms   "
+              f"p99 {nivel['p99_s'] * 1000:7.1f} ms   RSS {nivel['rss_bytes'] / 2**20:7.1f} MB "
+              f"(pico {nivel['rss_peak_bytes'] / 2**20:.1f})")
+        for nombre, r in nivel["por_interaccion"].items():
+            print(f"      {nombre:<16} n={r['n']:<4} p50 {r['p50_s'] * 1000:7.1f} ms   "
+                  f"p95 {r['p95_s'] * 1000:7.1f} ms   p99 {r['p99_s'] * 1000:7.1f} ms")
+    return niveles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--interactions", type=int, default=20, help="interacciones por sesión")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=None, help="puerto del servidor (por defecto, uno libre)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="segundos máximos por rerun")
+    parser.add_argument("--output", default=None, help="archivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    data_dir = tempfile.mkdtemp(prefix="inventario-carga-")
+    write_mirror(data_dir, args.rows, args.seed)
+    port = args.port or free_port()
+    server = start_server(port, data_dir, os.path.join(data_dir, "servidor.log"))
+    try:
+        niveles = asyncio.run(run(port, server.pid, args))
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"rows": args.rows, "levels": niveles}, f, indent=2)
+        print(f"Resultados en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Latencia de un clic en el mapa de Estados: navegación completa frente a rerun en la sesión.
+
+Antes cada mosaico era un enlace `?estado=...`: el navegador recargaba la
+página, abría otro websocket y Streamlit creaba una sesión nueva. Ahora es un
+botón que actualiza `filtro_estado` en la sesión existente. Contra un servidor
+real:
+
+    streamlit run app.py --server.port 8599 &
+    python -m bench.map_latency --port 8599
+
+La navegación completa se mide como GET de la página más sesión nueva con
+`?estado=` hasta `script_finished`; es una cota inferior, porque el navegador
+además vuelve a evaluar el JavaScript y a pedir imágenes y estilos.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import urllib.parse
+import urllib.request
+
+from streamlit.proto.ClientState_pb2 import ClientState
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+from bench.rerun_latency import _p95, rerun
+
+ESTADOS = ["BAJA CALIFORNIA", "COAHUILA", "NUEVO LEON", "GUANAJUATO", "CIUDAD DE MEXICO", "YUCATAN"]
+
+
+async def connect(port):
+    return await websocket_connect(f"ws://localhost:{port}/_stcore/stream", subprotocols=["streamlit"])
+
+
+async def navegacion_completa(port, estado):
+    start = time.perf_counter()
+    await asyncio.to_thread(lambda: urllib.request.urlopen(f"http://localhost:{port}/?estado={urllib.parse.quote(estado)}").read())
+    ws = await connect(port)
+    await rerun(ws, ClientState(query_string=f"estado={urllib.parse.quote(estado)}"))
+    segundos = time.perf_counter() - start
+    ws.close()
+    return segundos
+
+
+async def main(port, repeat):
+    completa = []
+    for estado in ESTADOS * repeat:
+        completa.append(await navegacion_completa(port, estado) * 1000)
+
+    ws = await connect(port)
+    _, found = await rerun(ws, ClientState())
+    en_sesion = []
+    for i in list(range(len(ESTADOS))) * repeat:
+        boton = next(id_ for id_ in found["buttons"] if id_.endswith(f"mapa_{i}"))
+        state = ClientState()
+        state.widget_states.widgets.append(WidgetState(id=boton, trigger_value=True))
+        segundos, found = await rerun(ws, state)
+        en_sesion.append(segundos * 1000)
+    ws.close()
+
+    for modo, tiempos in (("navegación", completa), ("en sesión", en_sesion)):
+        print(f"{modo:<11} p50 {statistics.median(tiempos):7.1f} ms   p95 {_p95(tiempos):7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8501)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.port, args.repeat))
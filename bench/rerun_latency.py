@@ -0,0 +1,87 @@
+"""Latencia de reruns completos frente a reruns de fragmento, contra un servidor real.
+
+Streamlit solo ejecuta un fragmento por separado cuando lo pide el navegador,
+así que este script habla el protocolo del websocket como lo haría uno:
+
+    INVENTARIO_TIMING_LOG=/tmp/tiempos.jsonl streamlit run app.py --server.port 8599 &
+    python -m bench.rerun_latency --port 8599
+
+Para cada página escribe una serie de consultas en el buscador, primero como
+rerun completo y luego solo en el fragmento de la tabla, y muestra p50/p95 del
+tiempo hasta `script_finished`. El JSONL de tiempos separa el costo del lado
+del servidor (`app.py` frente a `app.py#tabla`).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ClientState_pb2 import ClientState
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+QUERIES = ["p", "pe", "per", "pere", "perez", "perez l", "perez la"]
+
+
+async def rerun(ws, client_state, timeout=60):
+    """Pide un rerun y espera a que termine; devuelve los segundos y lo que se vio en la respuesta."""
+    msg = BackMsg()
+    msg.rerun_script.CopyFrom(client_state)
+    start = time.perf_counter()
+    await ws.write_message(msg.SerializeToString(), binary=True)
+    found = {"pages": {}, "fragments": set(), "search": None, "buttons": {}, "selectboxes": {}, "in_fragment": set()}
+    while True:
+        fm = ForwardMsg()
+        fm.ParseFromString(await asyncio.wait_for(ws.read_message(), timeout))
+        kind = fm.WhichOneof("type")
+        if kind == "navigation":
+            found["pages"] = {p.url_pathname or "app": p.page_script_hash for p in fm.navigation.app_pages}
+        elif kind == "delta":
+            if fm.delta.fragment_id:
+                found["fragments"].add(fm.delta.fragment_id)
+            if fm.delta.WhichOneof("type") == "new_element":
+                el = fm.delta.new_element
+                widget_id = getattr(getattr(el, el.WhichOneof("type") or "", None), "id", None)
+                if fm.delta.fragment_id and widget_id:
+                    found["in_fragment"].add(widget_id)
+                if el.WhichOneof("type") == "text_input" and "Buscar" in el.text_input.label:
+                    found["search"] = el.text_input.id
+                elif el.WhichOneof("type") == "button":
+                    found["buttons"][el.button.id] = el.button.label
+                elif el.WhichOneof("type") == "selectbox":
+                    found["selectboxes"][el.selectbox.id] = list(el.selectbox.options)
+        elif kind == "script_finished":
+            return time.perf_counter() - start, found
+
+
+def _p95(values):
+    values = sorted(values)
+    return values[max(0, int(round(len(values) * 0.95)) - 1)]
+
+
+async def main(port, repeat):
+    ws = await websocket_connect(f"ws://localhost:{port}/_stcore/stream", subprotocols=["streamlit"])
+    _, info = await rerun(ws, ClientState())
+    for page, page_hash in info["pages"].items():
+        await rerun(ws, ClientState(page_script_hash=page_hash))
+        _, found = await rerun(ws, ClientState(page_script_hash=page_hash))
+        for modo in ("completo", "fragmento"):
+            fragment_id = next(iter(found["fragments"]), "") if modo == "fragmento" else ""
+            tiempos = []
+            for query in QUERIES * repeat:
+                state = ClientState(page_script_hash=page_hash, fragment_id=fragment_id)
+                state.widget_states.widgets.append(WidgetState(id=found["search"], string_value=query))
+                segundos, _ = await rerun(ws, state)
+                tiempos.append(segundos * 1000)
+            print(f"{page:<6} {modo:<10} p50 {statistics.median(tiempos):7.1f} ms   p95 {_p95(tiempos):7.1f} ms")
+    ws.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8501)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.port, args.repeat))
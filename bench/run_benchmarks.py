@@ -0,0 +1,286 @@
+"""Mide cada etapa de app.py y pages/Tel.py sobre inventarios sintéticos.
+
+Uso:
+    python -m bench.run_benchmarks --rows 10000 100000 --output bench/results/actual.json
+    python -m bench.run_benchmarks --rows 10000 --compare bench/results/anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from st_aggrid import GridOptionsBuilder
+
+from bench.synthetic import make_cambios, make_fake_client, make_hoja1
+from inventario.changes import ChangeLog
+from inventario.charts import crear_area, crear_dona, crear_medidor
+from inventario.datasource import COMPUTO, TELEFONOS, GoogleSheetsSource, load_dataset
+from inventario.dtypes import memory_report
+from inventario.export import FORMATS
+from inventario.facets import FacetIndex, intersect, take
+from inventario.grid import page_window
+from inventario.parsing import parse_numeric_series, parse_numeric_value
+from inventario.refresh import Snapshot, frames_version
+from inventario.search import KeyIndex, SearchIndex
+from inventario.summary import summarize, web_counts
+
+PAGE_SIZE = 100
+
+
+class Timer:
+    def __init__(self, page, rows, repeat):
+        self.page = page
+        self.rows = rows
+        self.repeat = repeat
+        self.results = []
+
+    def run(self, stage, func, rows_in=None):
+        tiempos = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            out = func()
+            tiempos.append(time.perf_counter() - start)
+        rows_out = len(out) if hasattr(out, "__len__") and not isinstance(out, (str, dict)) else None
+        self.results.append({
+            "page": self.page, "rows": self.rows, "stage": stage,
+            "min_s": min(tiempos), "median_s": statistics.median(tiempos),
+            "rows_in": rows_in, "rows_out": rows_out,
+        })
+        return out
+
+
+def table_memory(t, frames):
+    for r in memory_report(frames):
+        t.results.append({"page": t.page, "rows": t.rows, "stage": "table_memory", **r})
+
+
+def memory_per_session(t, df, session, sessions=20):
+    """Memoria que retiene cada sesión adicional con sus selecciones y su página de tabla.
+
+    Las sesiones comparten el snapshot y los índices; lo propio de cada una
+    son arreglos de posiciones y la página que se envía a AgGrid.
+    """
+    session()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    retained = [session() for _ in range(sessions)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    t.results.append({
+        "page": t.page, "rows": t.rows, "stage": "memory_per_session",
+        "bytes_per_session": used / len(retained),
+        "table_bytes": int(df.memory_usage(deep=True).sum()),
+    })
+
+
+def export_memory(t, df, positions, columns):
+    """Pico de memoria al exportar la vista por bloques; no debe crecer con la tabla."""
+    for formato, (writer, _, _) in FORMATS.items():
+        tracemalloc.start()
+        size = sum(len(block) for block in writer(df, positions, columns))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        t.results.append({
+            "page": t.page, "rows": t.rows, "stage": f"export_{formato.lower()}",
+            "rows_out": len(positions), "export_bytes": size, "peak_bytes": peak,
+        })
+
+
+def grid_options(df, positions, columns):
+    window = page_window(positions, len(df) if positions is None else len(positions), 1, PAGE_SIZE)
+    page = take(df, window, columns)
+    gb = GridOptionsBuilder.from_dataframe(page)
+    gb.configure_default_column(editable=False, resizable=False, sortable=False, filter=False, minWidth=80)
+    return gb.build()
+
+
+def typing(index, text, incremental):
+    """Escribe `text` letra por letra, con el índice en frío; devuelve las filas de la consulta final."""
+    index._cache.clear()
+    result = None
+    for end in range(1, len(text) + 1):
+        result = index.refine(text[:end], result if incremental else None)
+    return result.rows
+
+
+def bench_computo(client, rows, repeat):
+    t = Timer("app.py", rows, repeat)
+    source = GoogleSheetsSource(lambda: client)
+    frames = t.run("load", lambda: load_dataset(source, COMPUTO.with_overrides(False)))
+    df_table = frames["table"]
+    t.run("snapshot_version", lambda: frames_version(frames), len(df_table))
+    table_memory(t, frames)
+
+    facets = t.run("facet_index_build", lambda: FacetIndex(df_table, ["ESTATUS", "ESTADO"], frames["table_keys"]), len(df_table))
+    filtros = {"ESTATUS": "ACTIVA", "ESTADO": "NUEVO LEON"}
+    posiciones = t.run("status_state_filter", lambda: facets.select(filtros), len(df_table))
+    t.run("facet_counts", lambda: facets.counts_excluding("ESTADO", filtros), len(df_table))
+
+    columnas = [c for c in df_table.columns if c not in ("IMAGEN", "*", "")]
+    index = t.run("search_index_build", lambda: SearchIndex(df_table, columnas), len(df_table))
+    encontrados = t.run("search", lambda: intersect(posiciones, index.search("pérez latitude")), len(df_table))
+    t.run("search_typing", lambda: typing(index, "pérez latitude", False), len(df_table))
+    t.run("search_typing_incremental", lambda: typing(index, "pérez latitude", True), len(df_table))
+
+    resumen = t.run("summary", lambda: summarize(df_table, ("ESTATUS",), frames["table_keys"]), len(df_table))
+    t.run("chart_build", lambda: crear_dona.__wrapped__(resumen.frame("ESTATUS")))
+    t.run("grid_options_build", lambda: grid_options(df_table, encontrados, columnas), len(encontrados))
+
+    def session():
+        posiciones = intersect(facets.select(filtros), index.search("pérez latitude"))
+        return posiciones, take(df_table, page_window(posiciones, len(posiciones), 1, PAGE_SIZE), columnas)
+
+    memory_per_session(t, df_table, session)
+    export_memory(t, df_table, posiciones, columnas)
+    return t.results
+
+
+def bench_telefonos(client, rows, repeat):
+    t = Timer("pages/Tel.py", rows, repeat)
+    source = GoogleSheetsSource(lambda: client)
+    frames = t.run("load", lambda: load_dataset(source, TELEFONOS))
+    df_table, df_gauges = frames["table"], frames["gauges"]
+    t.run("snapshot_version", lambda: frames_version(frames), len(df_table))
+    table_memory(t, frames)
+
+    facets = t.run("facet_index_build", lambda: FacetIndex(df_table, ["ESTATUS", "Región", "Departamento", "Marca", "Modelo"], frames["table_keys"]), len(df_table))
+    activas = t.run("status_filter", lambda: facets.rows("ESTATUS", "ACTIVA"), len(df_table))
+
+    plan = df_table["Plan Y Servicios contratados"]
+    parsed = t.run("numeric_parse", lambda: parse_numeric_series(plan), len(plan))
+    referencia = t.run("numeric_parse_reference", lambda: plan.astype(object).apply(parse_numeric_value), len(plan))
+    if not ((parsed.isna() & referencia.isna()) | (parsed == referencia)).all():
+        raise AssertionError("parse_numeric_series no coincide con parse_numeric_value")
+    t.run("plan_totals", lambda: parsed.take(activas).dropna().agg(["sum", "mean"]), len(activas))
+
+    columnas = list(df_table.columns)
+    index = t.run("search_index_build", lambda: SearchIndex(df_table, columnas), len(df_table))
+    encontrados = t.run("search", lambda: intersect(activas, index.search("iphone 13")), len(df_table))
+    t.run("search_typing", lambda: typing(index, "iphone 13", False), len(df_table))
+    t.run("search_typing_incremental", lambda: typing(index, "iphone 13", True), len(df_table))
+    imei = df_table["IMEI"].iloc[len(df_table) // 2]
+    imeis = t.run("key_index_build", lambda: KeyIndex(df_table["IMEI"], "id"), len(df_table))
+    t.run("imei_lookup", lambda: imeis.get(imei), len(df_table))
+
+    n = max(1, rows // 1000)
+    hoja1 = make_hoja1(rows)
+    anterior, actual = Snapshot({"table": hoja1}, "v1", 1.0), Snapshot({"table": make_cambios(hoja1, n)}, "v2", 2.0)
+    delta = t.run("changes_record", lambda: ChangeLog(TELEFONOS.key).record(anterior, actual), len(df_table))
+    conteo = delta.changes["cambio"].value_counts().to_dict()
+    if conteo != {"modificado": n, "baja": n, "alta": n}:
+        raise AssertionError(f"El historial de cambios no coincide con los cambios hechos: {conteo}")
+    historial = ChangeLog(TELEFONOS.key)
+    historial.record(anterior, actual)
+    t.run("changes_since", lambda: historial.since(0.0), len(delta.changes))
+
+    resumen = t.run("summary", lambda: summarize(df_table, ("ESTATUS", "Estado"), frames["table_keys"]), len(df_table))
+    valores = {
+        "TOTAL": resumen.total_of("ESTATUS"),
+        "ACTIVOS": resumen.count("ESTATUS", "ACTIVA"),
+        "DISPONIBLES": resumen.count("ESTATUS", "DISPONIBLE"),
+        "BAJA": resumen.count("ESTATUS", "BAJA"),
+    }
+    web = web_counts(df_gauges, frames["gauges_keys"])
+    if any(web.get(k) != v for k, v in valores.items()):
+        raise AssertionError(f"El resumen calculado no coincide con la hoja Web: {valores} != {web}")
+
+    def charts():
+        datos = resumen.frame("Estado").rename(columns={"Etiqueta": "Estado", "Equipos": "Equipos por Estado"})
+        figs = [crear_area.__wrapped__(datos)]
+        for metrica in ("ACTIVOS", "DISPONIBLES", "BAJA"):
+            figs.append(crear_medidor.__wrapped__(valores[metrica] / valores["TOTAL"] * 100, metrica.capitalize(), "#13C3E8"))
+        return figs
+
+    t.run("chart_build", charts, len(df_table))
+    t.run("grid_options_build", lambda: grid_options(df_table, encontrados, columnas), len(encontrados))
+
+    def session():
+        posiciones = intersect(activas, index.search("iphone 13"))
+        return posiciones, take(df_table, page_window(posiciones, len(posiciones), 1, PAGE_SIZE), columnas)
+
+    memory_per_session(t, df_table, session)
+    return t.results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(actual, anterior):
+    previos = {(r["page"], r["rows"], r["stage"]): r["median_s"] for r in anterior["results"] if "median_s" in r}
+    print(f"\nComparación con {anterior['meta'].get('commit')}:")
+    for r in actual["results"]:
+        if "median_s" not in r:
+            continue
+        antes = previos.get((r["page"], r["rows"], r["stage"]))
+        if antes:
+            print(f"  {r['page']:<13} {r['rows']:>8} {r['stage']:<24} {antes * 1000:9.2f} ms -> {r['median_s'] * 1000:9.2f} ms  x{r['median_s'] / antes:5.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="segundos simulados por llamada a la API de Sheets")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="archivo JSON de resultados (por defecto bench/results/<commit>-<fecha>.json)")
+    parser.add_argument("--compare", default=None, help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for rows in args.rows:
+        client = make_fake_client(rows, seed=args.seed, latency=args.latency)
+        resultados += bench_computo(client, rows, args.repeat)
+        resultados += bench_telefonos(client, rows, args.repeat)
+        print(f"{rows:>9} filas: " + ", ".join(
+            f"{r['page']}:{r['stage']}={r['median_s'] * 1000:.1f}ms" for r in resultados if r["rows"] == rows and "median_s" in r
+        ))
+        for r in resultados:
+            if r["rows"] == rows and r["stage"] == "table_memory":
+                print(f"{'':>9}  {r['page']} {r['tabla']}: {r['object_bytes'] / 2**20:.1f} MB como object -> "
+                      f"{r['typed_bytes'] / 2**20:.1f} MB con tipos compactos")
+            if r["rows"] == rows and "bytes_per_session" in r:
+                print(f"{'':>9}  {r['page']}: {r['bytes_per_session'] / 1024:.1f} KB por sesión adicional "
+                      f"(tabla compartida: {r['table_bytes'] / 2**20:.1f} MB)")
+            if r["rows"] == rows and "peak_bytes" in r:
+                print(f"{'':>9}  {r['page']} {r['stage']}: {r['rows_out']:,} filas, {r['export_bytes'] / 2**20:.1f} MB "
+                      f"escritos con un pico de {r['peak_bytes'] / 2**20:.1f} MB")
+
+    commit = _git_commit()
+    salida = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "seed": args.seed,
+        },
+        "results": resultados,
+    }
+    output = args.output or os.path.join("bench", "results", f"{commit or 'local'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(salida, f, indent=2)
+    print(f"Resultados en {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(salida, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Inventarios sintéticos y un cliente falso de gspread para medir sin red."""
+import time
+
+import numpy as np
+import pandas as pd
+from gspread.utils import numericise_all
+
+from inventario.datasource import COMPUTO, TELEFONOS
+
+ESTATUS = ["ACTIVA", "DISPONIBLE", "OBSOLETA", "VENTA/DONAR", "VENDIDA", "DAÑADA", "BAJA", "ROBO"]
+ESTATUS_PESOS = [0.55, 0.15, 0.08, 0.04, 0.04, 0.05, 0.06, 0.03]
+ESTADOS = ["BAJA CALIFORNIA", "COAHUILA", "NUEVO LEON", "GUANAJUATO", "CIUDAD DE MEXICO", "YUCATAN"]
+ESTADOS_TEL = ["Baja California", "Coahuila", "Nuevo León", "Guanajuato", "Ciudad de México", "Yucatán"]
+REGIONES = ["Norte", "Noreste", "Bajío", "Centro", "Sureste"]
+NOMBRES = ["José", "María", "Ana", "Luis", "Jesús", "Sofía", "Andrés", "Lucía", "Raúl", "Mónica"]
+APELLIDOS = ["Pérez", "Núñez", "Gómez", "Hernández", "López", "Martínez", "Ramírez", "Sánchez", "Íñiguez", "Ortíz"]
+DEPARTAMENTOS = ["Comercial", "Operaciones", "Finanzas", "Sistemas", "Logística", "Dirección"]
+PUESTOS = ["Vendedor", "Supervisor", "Gerente", "Analista", "Técnico", "Chofer"]
+MARCAS_PC = {"Dell": ["Latitude 5420", "OptiPlex 7090"], "HP": ["ProBook 440", "EliteDesk 800"], "Lenovo": ["ThinkPad T14", "ThinkCentre M70"]}
+MARCAS_TEL = {"Apple": ["iPhone 12", "iPhone 13", "iPhone 14"], "Samsung": ["Galaxy A54", "Galaxy S23"], "Motorola": ["Moto G84"]}
+
+
+def _choice(rng, values, n, p=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=p)]
+
+
+def _nombres(rng, n):
+    return pd.Series(_choice(rng, NOMBRES, n)) + " " + pd.Series(_choice(rng, APELLIDOS, n))
+
+
+def _marca_modelo(rng, catalogo, n):
+    pares = [(marca, modelo) for marca, modelos in catalogo.items() for modelo in modelos]
+    idx = rng.integers(0, len(pares), n)
+    return (np.array([m for m, _ in pares], dtype=object)[idx], np.array([m for _, m in pares], dtype=object)[idx])
+
+
+def _desordenar(rng, values, fraccion=0.05):
+    """Mezcla mayúsculas y espacios en una fracción de celdas, como en la hoja real."""
+    values = pd.Series(values, dtype=object)
+    sucias = rng.random(len(values)) < fraccion
+    values[sucias] = values[sucias].str.lower() + " "
+    return values.to_numpy()
+
+
+def _costos(rng, n):
+    base = rng.choice([199.0, 299.0, 399.0, 499.0, 649.9, 899.0, 1200.5, 1599.0], size=n)
+    formato = rng.integers(0, 6, n)
+    texto = np.empty(n, dtype=object)
+    for f, plantilla in enumerate([
+        lambda v: f"${v:,.2f}",
+        lambda v: f"{v:,.2f}".replace(",", "_").replace(".", ",").replace("_", "."),
+        lambda v: f"$ {v:.0f}",
+        lambda v: f"{v:.2f} MXN",
+        lambda v: "N/A",
+        lambda v: "",
+    ]):
+        sel = formato == f
+        texto[sel] = [plantilla(v) for v in base[sel]]
+    return texto
+
+
+def make_equipos(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    marca, modelo = _marca_modelo(rng, MARCAS_PC, rows)
+    return pd.DataFrame({
+        "*": "",
+        "ESTATUS": _desordenar(rng, _choice(rng, ESTATUS, rows, ESTATUS_PESOS)),
+        "ESTADO": _choice(rng, ESTADOS, rows),
+        "TIPO": _choice(rng, ["LAPTOP", "ESCRITORIO"], rows),
+        "MARCA": marca,
+        "MODELO": modelo,
+        "N° SERIE": pd.Series(rng.integers(10**7, 10**8, rows)).map("SN{:d}".format).to_numpy(),
+        "USUARIO": _nombres(rng, rows).to_numpy(),
+        "DEPARTAMENTO": _choice(rng, DEPARTAMENTOS, rows),
+        "IMAGEN": "",
+    })
+
+
+def make_web_computo(equipos):
+    conteo = equipos["ESTATUS"].str.strip().str.upper().value_counts()
+    return pd.DataFrame({"Etiqueta": ESTATUS, "Equipos": [int(conteo.get(e, 0)) for e in ESTATUS]})
+
+
+def make_hoja1(rows, seed=0, relleno=True):
+    """`rows` líneas; con `relleno`, al final van filas vacías y la fila de TOTAL, como en la hoja real."""
+    rng = np.random.default_rng(seed + 1)
+    marca, modelo = _marca_modelo(rng, MARCAS_TEL, rows)
+    telefono = pd.Series(rng.integers(10**9, 10**10 - 1, rows)).astype(str)
+    telefono = (telefono.str[:2] + " " + telefono.str[2:6] + "-" + telefono.str[6:]).to_numpy()
+    hoja1 = pd.DataFrame({
+        "Región": _choice(rng, REGIONES, rows),
+        "Número de Teléfono": telefono,
+        "Plan Y Servicios contratados": _costos(rng, rows),
+        "Ciudad": _choice(rng, ["Monterrey", "Saltillo", "León", "Mérida", "Tijuana", "CDMX"], rows),
+        "Estado": _choice(rng, ESTADOS_TEL, rows),
+        "Empleado": _nombres(rng, rows).to_numpy(),
+        "Puesto": _choice(rng, PUESTOS, rows),
+        "Departamento": _choice(rng, DEPARTAMENTOS, rows),
+        "Marca": marca,
+        "Modelo": modelo,
+        "IMEI": pd.Series(rng.integers(10**14, 10**15, rows)).astype(str).to_numpy(),
+        "N° SERIE": pd.Series(rng.integers(10**9, 10**10, rows)).map("TS{:d}".format).to_numpy(),
+        "ESTATUS": _desordenar(rng, _choice(rng, ["ACTIVA", "DISPONIBLE", "BAJA"], rows, [0.8, 0.12, 0.08])),
+    })
+    if not relleno:
+        return hoja1
+    vacias = pd.DataFrame("", index=range(max(1, rows // 20)), columns=hoja1.columns)
+    total = pd.DataFrame([{**dict.fromkeys(hoja1.columns, ""), "Estado": "TOTAL", "ESTATUS": "TOTAL"}])
+    return pd.concat([hoja1, vacias, total], ignore_index=True)
+
+
+def _lineas(hoja1):
+    """Solo las líneas reales de la Hoja 1: sin filas vacías ni la de TOTAL."""
+    estatus = hoja1["ESTATUS"].str.strip().str.upper()
+    return hoja1[~estatus.isin(["", "TOTAL"])]
+
+
+def make_web_telefonos(hoja1):
+    hoja1 = _lineas(hoja1)
+    estatus = hoja1["ESTATUS"].str.strip().str.upper().value_counts()
+    modelos = sorted(hoja1["Modelo"].unique())
+    etiquetas = pd.DataFrame({
+        "Etiqueta": ["TOTAL", "ACTIVOS", "DISPONIBLES", "BAJA"],
+        "Equipos": [len(hoja1), int(estatus.get("ACTIVA", 0)), int(estatus.get("DISPONIBLE", 0)), int(estatus.get("BAJA", 0))],
+    })
+    obsolescencia = pd.DataFrame({"Modelo": modelos, "Obsolecencia": ["Obsoleto" if "12" in m else "Vigente" for m in modelos]})
+    return pd.concat([etiquetas, obsolescencia], axis=1).fillna("")
+
+
+def make_cambios(hoja1, n, seed=0):
+    """La misma Hoja 1 en una carga posterior: `n` líneas pasan a ROBO, `n` desaparecen y llegan `n` nuevas."""
+    rng = np.random.default_rng(seed + 2)
+    filas = rng.choice(_lineas(hoja1).index.to_numpy(), size=2 * n, replace=False)
+    nueva = hoja1.copy()
+    nueva.loc[filas[:n], "ESTATUS"] = "ROBO"
+    altas = make_hoja1(n, seed + 3, relleno=False).assign(IMEI=[str(10**15 + i) for i in range(n)])
+    return pd.concat([nueva.drop(index=filas[n:]), altas], ignore_index=True)
+
+
+class FakeWorksheet:
+    """Hoja en memoria con la interfaz de lectura de gspread que usan las páginas."""
+
+    def __init__(self, grid, client):
+        self._grid = grid
+        self._client = client
+
+    def get_all_values(self):
+        self._client.wait()
+        return [list(map(str, row)) for row in self._grid]
+
+    def get_all_records(self):
+        self._client.wait()
+        header, *rows = self._grid
+        return [dict(zip(header, numericise_all([str(v) for v in row]))) for row in rows]
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets, client):
+        self._worksheets = worksheets
+        self._client = client
+
+    def worksheet(self, name):
+        self._client.wait()
+        return FakeWorksheet(self._worksheets[name], self._client)
+
+    def values_batch_get(self, ranges, params=None):
+        self._client.wait()
+        value_ranges = []
+        for r in ranges:
+            name = r[1:-1].replace("''", "'") if r.startswith("'") else r
+            value_ranges.append({"range": r, "values": [list(map(str, row)) for row in self._worksheets[name]]})
+        return {"valueRanges": value_ranges}
+
+
+class FakeClient:
+    """Sustituto de `gspread.Client`; `latency` simula la espera de cada llamada a la API."""
+
+    def __init__(self, spreadsheets, latency=0.0):
+        self._spreadsheets = spreadsheets
+        self.latency = latency
+        self.calls = 0
+
+    def wait(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def open_by_url(self, url):
+        self.wait()
+        return FakeSpreadsheet(self._spreadsheets[url], self)
+
+
+def _grid(df, title_rows=0):
+    header = [list(df.columns)]
+    titulo = [["Inventario de líneas telefónicas"] + [""] * (len(df.columns) - 1)] + [[""] * len(df.columns)] * (title_rows - 1)
+    return (titulo if title_rows else []) + header + df.to_numpy(dtype=object).tolist()
+
+
+def make_fake_client(rows, seed=0, latency=0.0):
+    """Cliente falso con ambos libros: `Equipos`/`Web` y `Hoja 1` (encabezado en la fila 4)/`Web`."""
+    equipos = make_equipos(rows, seed)
+    hoja1 = make_hoja1(rows, seed)
+    spreadsheets = {
+        COMPUTO.url: {"Web": _grid(make_web_computo(equipos)), "Equipos": _grid(equipos)},
+        TELEFONOS.url: {"Hoja 1": _grid(hoja1, title_rows=3), "Web": _grid(make_web_telefonos(hoja1))},
+    }
+    return FakeClient(spreadsheets, latency)
@@ -0,0 +1,7 @@
+"""Componentes compartidos por las páginas del inventario."""
+import pandas as pd
+
+# Los DataFrame del snapshot se comparten entre todas las sesiones. Con
+# copy-on-write, selecciones, renombres y `take` son vistas perezosas y una
+# escritura accidental nunca llega a los datos compartidos.
+pd.set_option("mode.copy_on_write", True)
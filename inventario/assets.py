@@ -0,0 +1,65 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+
+import streamlit as st
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GENERATED_DIR = os.path.join(ROOT_DIR, "static", "generated")
+MAP_TILE_WIDTH = 360
+
+
+def optimize_image(path, width, quality=85):
+    """Reduce la imagen a `width` px de ancho y la codifica como WebP."""
+    with Image.open(path) as im:
+        im.thumbnail((width, im.height))
+        buf = io.BytesIO()
+        im.save(buf, "WEBP", quality=quality)
+    return buf.getvalue()
+
+
+def _publish(name, data):
+    os.makedirs(GENERATED_DIR, exist_ok=True)
+    target = os.path.join(GENERATED_DIR, name)
+    if not os.path.exists(target):
+        tmp = f"{target}.tmp-{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+    return f"app/static/generated/{name}"
+
+
+@st.cache_resource
+def image_aspect(path):
+    """Proporción ancho/alto de la imagen, para reservar su espacio con CSS. None si no existe."""
+    try:
+        with Image.open(os.path.join(ROOT_DIR, path)) as im:
+            return im.width / im.height
+    except FileNotFoundError:
+        return None
+
+
+@st.cache_resource
+def image_src(path, width=MAP_TILE_WIDTH):
+    """Valor de `src` para <img>, calculado una sola vez por imagen.
+
+    Con server.enableStaticServing se publica el WebP en static/ con la huella
+    en el nombre, así el navegador lo guarda en caché; si no, se devuelve como
+    data URI. None si la imagen no existe.
+    """
+    try:
+        data = optimize_image(os.path.join(ROOT_DIR, path), width)
+    except FileNotFoundError:
+        return None
+    if st.get_option("server.enableStaticServing"):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        try:
+            return _publish(f"{stem}-{width}-{hashlib.sha1(data).hexdigest()[:10]}.webp", data)
+        except OSError:
+            logger.warning("No se pudo publicar %s en static/; se usará data URI", path, exc_info=True)
+    return "data:image/webp;base64," + base64.b64encode(data).decode()
@@ -0,0 +1,293 @@
+import bisect
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import streamlit as st
+
+from inventario.keys import canonical_key
+from inventario.schema import CLAVES_ESTABLES, match_schema
+
+logger = logging.getLogger(__name__)
+
+COLUMNAS = ["clave", "identificador", "cambio", "campo", "antes", "despues", "fecha"]
+ALTA, BAJA, MODIFICADO = "alta", "baja", "modificado"
+
+
+@dataclass(frozen=True)
+class TableState:
+    """Huella de una tabla: id estable y hash de cada fila identificable."""
+    column: str
+    columns: tuple
+    ids: pd.Index
+    rows: np.ndarray
+    hashes: np.ndarray
+
+
+@dataclass(frozen=True)
+class Delta:
+    """Filas que cambiaron entre la carga de `since` y la de `loaded_at`, en formato largo."""
+    version: str
+    loaded_at: float
+    since: float
+    changes: pd.DataFrame
+
+
+def _text(series):
+    return series.astype(object).where(series.notna(), "").astype(str).to_numpy(dtype=object)
+
+
+def _row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def stable_ids(series):
+    """(ids, filas): clave normalizada de cada fila con un identificador que no se repite.
+
+    Las filas con identificador vacío o repetido no se pueden seguir entre
+    cargas: numerarlas por posición haría que una fila insertada más arriba
+    cambiara el id de las de abajo. Se dejan fuera.
+
+    La misma idea que `identifier_key` (minúsculas, sin espacios, guiones,
+    puntos ni diagonales), pero con Arrow sobre todos los valores a la vez.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    uniques = pa.array(_text(pd.Series(uniques, dtype=object)), type=pa.string())
+    normalized = pc.replace_substring_regex(pc.utf8_lower(uniques), r"[\s\-./]", "")
+    keys = normalized.to_numpy(zero_copy_only=False)[codes]
+    rows = np.flatnonzero(keys != "")
+    keys = keys[rows]
+    unique = ~pd.Series(keys).duplicated(keep=False).to_numpy()
+    return pd.Index(keys[unique], dtype=object), rows[unique]
+
+
+def empty_changes():
+    return pd.DataFrame({c: pd.Series(dtype=float if c == "fecha" else object) for c in COLUMNAS})
+
+
+class ChangeLog:
+    """Historial de cambios del inventario entre cargas, por identificador estable (IMEI, N° SERIE).
+
+    De cada carga se guarda solo la huella de la tabla (un hash por fila);
+    al llegar una versión nueva se comparan las huellas y únicamente de las
+    filas distintas se extraen los campos que cambiaron. Cada diferencia se
+    conserva como un `Delta` pequeño (en memoria y, con `path`, en disco), así
+    que consultar los cambios desde una fecha cuesta lo que el número de
+    cambios y no lo que el tamaño de la tabla.
+    """
+
+    def __init__(self, dataset_key, path=None, keep=200):
+        self.dataset_key = dataset_key
+        self.path = path
+        self.keep = keep
+        self._state = None
+        self._deltas = self._load() if path else []
+
+    @property
+    def deltas(self):
+        return self._deltas
+
+    def record(self, previous, current, alias="table"):
+        """Compara dos snapshots y registra el delta; devuelve None si no hubo cambios."""
+        old_df, new_df = previous.frames.get(alias), current.frames.get(alias)
+        if old_df is None or new_df is None:
+            return None
+        columns = tuple(c for c in new_df.columns if c in set(old_df.columns))
+        old, new = self.state(previous.version, old_df, columns), self.state(current.version, new_df, columns)
+        if new is not None:
+            self._state = (current.version, new)
+        if old is None or new is None:
+            return None
+
+        position = new.ids.get_indexer(old.ids)
+        kept = np.flatnonzero(position >= 0)
+        modified = kept[old.hashes[kept] != new.hashes[position[kept]]]
+        removed = np.flatnonzero(position < 0)
+        added = np.flatnonzero(old.ids.get_indexer(new.ids) < 0)
+
+        parts = [
+            self._cells(old_df, new_df, columns, old, new, modified, position[modified]),
+            self._rows(BAJA, old_df, old, removed),
+            self._rows(ALTA, new_df, new, added),
+        ]
+        changes = pd.concat([p for p in parts if len(p)] or [empty_changes()], ignore_index=True)
+        if changes.empty:
+            return None
+        changes["fecha"] = current.loaded_at
+        delta = Delta(current.version, current.loaded_at, previous.loaded_at, changes[COLUMNAS])
+        self._save(delta)
+        self._deltas = [*self._deltas, delta][-self.keep:]
+        logger.info(
+            "Inventario '%s': %d altas, %d bajas y %d filas modificadas",
+            self.dataset_key, len(added), len(removed), len(modified),
+        )
+        return delta
+
+    def state(self, version, df, columns):
+        """Huella de `df` sobre `columns`; la de la carga vigente se reutiliza en la siguiente comparación."""
+        if self._state is not None and self._state[0] == version and self._state[1].columns == columns:
+            return self._state[1]
+        schema = match_schema(self.dataset_key, tuple(df.columns))
+        column = next((schema.get(f) for f in CLAVES_ESTABLES[self.dataset_key] if schema.get(f) in columns), None)
+        if column is None:
+            return None
+        ids, rows = stable_ids(df[column])
+        if len(rows) < len(df):
+            logger.info(
+                "Inventario '%s' versión %s: %d filas sin '%s' o con él repetido quedan fuera del historial",
+                self.dataset_key, version, len(df) - len(rows), column,
+            )
+        hashes = _row_hashes(df[list(columns)])[rows]
+        return TableState(column, columns, ids, rows, hashes)
+
+    def _cells(self, old_df, new_df, columns, old, new, old_pos, new_pos):
+        """Una fila por campo que cambió en las filas modificadas."""
+        if len(old_pos) == 0:
+            return empty_changes()
+        old_rows, new_rows = old.rows[old_pos], new.rows[new_pos]
+        parts = []
+        for col in columns:
+            antes, despues = old_df[col].take(old_rows), new_df[col].take(new_rows)
+            changed = np.flatnonzero(_row_hashes(antes) != _row_hashes(despues))
+            if len(changed):
+                parts.append(pd.DataFrame({
+                    "clave": old.ids[old_pos[changed]],
+                    "identificador": _text(new_df[new.column].take(new_rows[changed])),
+                    "cambio": MODIFICADO,
+                    "campo": col,
+                    "antes": _text(antes.take(changed)),
+                    "despues": _text(despues.take(changed)),
+                }))
+        return pd.concat(parts, ignore_index=True) if parts else empty_changes()
+
+    def _rows(self, cambio, df, state, positions):
+        if len(positions) == 0:
+            return empty_changes()
+        return pd.DataFrame({
+            "clave": state.ids[positions],
+            "identificador": _text(df[state.column].take(state.rows[positions])),
+            "cambio": cambio, "campo": "", "antes": "", "despues": "",
+        })
+
+    def since(self, when, net=True):
+        """Cambios registrados después de `when` (epoch). Con `net`, solo el efecto acumulado."""
+        deltas = self._deltas
+        start = bisect.bisect_right([d.loaded_at for d in deltas], when)
+        if start == len(deltas):
+            return empty_changes()
+        changes = pd.concat([d.changes for d in deltas[start:]], ignore_index=True)
+        return net_changes(changes) if net else changes
+
+    def transitions(self, when, column):
+        """Conteo de (antes, después) de `column` desde `when`, p. ej. ACTIVA -> BAJA."""
+        return transitions(self.since(when), column)
+
+    def _load(self):
+        try:
+            names = sorted(n for n in os.listdir(self.path) if n.endswith(".arrow"))
+        except FileNotFoundError:
+            return []
+        deltas = []
+        for name in names[-self.keep:]:
+            try:
+                table = feather.read_table(os.path.join(self.path, name))
+                meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+                deltas.append(Delta(
+                    meta["version"], float(meta["loaded_at"]), float(meta["since"]), table.to_pandas()
+                ))
+            except Exception:
+                logger.warning("No se pudo leer el historial de cambios %s", name, exc_info=True)
+        return deltas
+
+    def _save(self, delta):
+        if not self.path:
+            return
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            table = pa.Table.from_pandas(delta.changes, preserve_index=False).replace_schema_metadata({
+                "version": delta.version, "loaded_at": repr(delta.loaded_at), "since": repr(delta.since),
+            })
+            name = f"{int(delta.loaded_at * 1000):015d}-{delta.version}.arrow"
+            tmp = os.path.join(self.path, f"{name}.tmp-{os.getpid()}")
+            feather.write_feather(table, tmp, compression="uncompressed")
+            os.replace(tmp, os.path.join(self.path, name))
+            for old in sorted(n for n in os.listdir(self.path) if n.endswith(".arrow"))[:-self.keep]:
+                os.remove(os.path.join(self.path, old))
+        except Exception:
+            logger.warning("No se pudo guardar el historial de cambios en %s", self.path, exc_info=True)
+
+
+def net_changes(changes):
+    """Reduce una secuencia de cambios a su efecto neto por identificador y campo.
+
+    Un campo que va y vuelve al mismo valor desaparece; también un equipo que
+    se da de alta y de baja (o de baja y otra vez de alta) dentro del periodo.
+    """
+    if changes.empty:
+        return changes
+    grupos = changes.groupby(["clave", "campo"], sort=False)
+    net = grupos.agg(
+        identificador=("identificador", "last"), primero=("cambio", "first"), cambio=("cambio", "last"),
+        antes=("antes", "first"), despues=("despues", "last"), fecha=("fecha", "last"),
+    ).reset_index()
+    celdas = (net["campo"] != "") & (net["antes"] != net["despues"])
+    filas = (net["campo"] == "") & (net["primero"] == net["cambio"])
+    return net[celdas | filas][COLUMNAS].reset_index(drop=True)
+
+
+def transitions(changes, column):
+    """Conteo de (antes, después) de `column` por clave canónica: "activa " y "ACTIVA" son el mismo estatus.
+
+    Los cambios que solo tocan mayúsculas, acentos o espacios no cuentan como
+    movimiento; cada clave se muestra con la primera variante que aparece.
+    """
+    changes = changes[changes["campo"] == column]
+    antes, despues = changes["antes"].map(canonical_key), changes["despues"].map(canonical_key)
+    etiquetas = {}
+    for clave, valor in zip([*antes, *despues], [*changes["antes"], *changes["despues"]]):
+        etiquetas.setdefault(clave, valor.strip().upper())
+    movidas = antes != despues
+    pares = pd.DataFrame({"antes": antes[movidas].map(etiquetas), "despues": despues[movidas].map(etiquetas)})
+    return pares.groupby(["antes", "despues"], sort=False).size().sort_values(ascending=False)
+
+
+def _fecha(ts):
+    return datetime.fromtimestamp(ts).strftime("%d/%m/%Y %H:%M")
+
+
+def render_changes(changes, key, status_column=None):
+    """Sección "Cambios desde...": altas, bajas y campos modificados desde una carga anterior."""
+    deltas = changes.deltas
+    with st.expander(f"🔁 Cambios en el inventario ({len(deltas)} actualizaciones registradas)"):
+        if not deltas:
+            st.caption("Aún no hay cambios registrados; se registran cada vez que se actualizan los datos.")
+            return
+        desde = st.selectbox(
+            "Cambios desde la carga del", sorted({d.since for d in deltas}, reverse=True),
+            format_func=_fecha, key=f"{key}_cambios_desde",
+        )
+        cambios = changes.since(desde)
+        filas = cambios[cambios["campo"] == ""]
+        c_altas, c_bajas, c_mod = st.columns(3)
+        c_altas.metric("Altas", int((filas["cambio"] == ALTA).sum()))
+        c_bajas.metric("Bajas", int((filas["cambio"] == BAJA).sum()))
+        c_mod.metric("Equipos modificados", cambios.loc[cambios["cambio"] == MODIFICADO, "clave"].nunique())
+        if status_column:
+            movimientos = transitions(cambios, status_column)
+            if len(movimientos):
+                st.markdown("  \n".join(
+                    f"**{antes or '(vacío)'} → {despues or '(vacío)'}**: {n}" for (antes, despues), n in movimientos.items()
+                ))
+        st.dataframe(
+            cambios.drop(columns="clave").assign(fecha=lambda d: d["fecha"].map(_fecha)).rename(columns={
+                "identificador": "Identificador", "cambio": "Cambio", "campo": "Campo",
+                "antes": "Antes", "despues": "Después", "fecha": "Fecha",
+            }),
+            hide_index=True, use_container_width=True,
+        )
@@ -0,0 +1,68 @@
+import plotly.express as px
+import plotly.graph_objects as go
+
+from inventario.figures import memoize_figure
+
+
+@memoize_figure
+def crear_dona(conteo):
+    fig = px.pie(
+        conteo, names="Etiqueta", values="Equipos", hole=0.50,
+        color_discrete_sequence=["#3BB5D4", "#003F7D", "#00A6FF", "#DFFC9D", "#385368", "#97D4DA", "#E68E8E", "#D85959"]
+    )
+    fig.update_traces(textinfo="percent+label", textfont_size=14, marker=dict(line=dict(color="#0E1117", width=2)))
+    fig.update_layout(
+        margin=dict(t=30, b=40, l=100, r=0), paper_bgcolor="#0E1117", plot_bgcolor="#0E1117", font=dict(color="white"),
+        legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1, font=dict(color="white", size=14))
+    )
+    fig.update_yaxes(scaleanchor="x", scaleratio=1)
+    return fig
+
+
+@memoize_figure
+def crear_medidor(valor, titulo, color_barra):
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = valor,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        number = {'suffix': "%", 'font': {'size': 36}, 'valueformat': '.1f'},
+        title = {'text': titulo, 'font': {'size': 16}},
+        gauge = {
+            'axis': {'range': [None, 100], 'visible': False},
+            'bar': {'color': color_barra, 'thickness': 0.8},
+            'bgcolor': "#2E2E2E",
+            'borderwidth': 2,
+            'bordercolor': "gray"
+        }
+    ))
+    fig.update_layout(
+        height=150,
+        margin=dict(l=10, r=10, t=40, b=10),
+        paper_bgcolor="rgba(0,0,0,0)", 
+        font={'color': "white"}
+    )
+    return fig
+
+
+@memoize_figure
+def crear_area(df_chart_data):
+    fig_area = px.area(
+        df_chart_data,
+        x='Estado',
+        y='Equipos por Estado',
+        title='Equipos por Estado',
+        labels={'Equipos por Estado': 'Número de Equipos', 'Estado': 'Estado'}
+    )
+
+    fig_area.update_traces(mode="lines", fill='tozeroy')
+    fig_area.update_layout(
+        height=490,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font_color='white',
+        xaxis=dict(showgrid=False),
+        yaxis=dict(gridcolor='#444'),
+        showlegend=False
+    )
+    return fig_area
+
@@ -0,0 +1,269 @@
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+
+import pandas as pd
+import pyarrow.parquet as pq
+import streamlit as st
+
+from inventario.dtypes import compact_frame
+from inventario.keys import with_keys
+from inventario.snapshots import to_arrow
+
+SHEETS_SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive.readonly"]
+
+
+@dataclass(frozen=True)
+class Sheet:
+    """Hoja de cálculo y la forma en que se convierte a DataFrame.
+
+    `override` marca las hojas de resumen que solo se leen con `resumen_web`.
+    """
+    name: str
+    header_row: int | None = None
+    as_text: bool = False
+    numeric: tuple = ()
+    override: bool = False
+
+
+@dataclass(frozen=True)
+class Dataset:
+    key: str
+    url: str
+    sheets: dict = field(default_factory=dict)
+    refresh_interval: int = 300
+
+    def with_overrides(self, enabled):
+        """El mismo libro sin las hojas de resumen si `enabled` es falso."""
+        if enabled:
+            return self
+        return replace(self, sheets={a: s for a, s in self.sheets.items() if not s.override})
+
+
+COMPUTO = Dataset(
+    key="computo",
+    url="https://docs.google.com/spreadsheets/d/1WSxtSCoKAZxXjuUKSN_YxuIBa9uEQtWYGRsK_UcWYMA/edit?gid=0#gid=0",
+    sheets={
+        "graph": Sheet("Web", numeric=("Equipos",), override=True),
+        "table": Sheet("Equipos", as_text=True),
+    },
+    refresh_interval=1000,
+)
+
+TELEFONOS = Dataset(
+    key="telefonos",
+    url="https://docs.google.com/spreadsheets/d/1hUDaaqzQ_LKT71YTTwwyRYvvg1itNm46Dhezlz-5Jdk/edit",
+    sheets={
+        "table": Sheet("Hoja 1", header_row=3, as_text=True),
+        "gauges": Sheet("Web", numeric=("Equipos",)),
+    },
+)
+
+DATASETS = {d.key: d for d in (COMPUTO, TELEFONOS)}
+
+
+class DataSource(ABC):
+    """Origen de las hojas del inventario. Devuelve un DataFrame por hoja."""
+
+    @abstractmethod
+    def read_dataset(self, dataset):
+        ...
+
+
+class GoogleSheetsSource(DataSource):
+    def __init__(self, client_factory):
+        self._client_factory = client_factory
+
+    def read_dataset(self, dataset):
+        """Lee todas las hojas del libro con una sola petición `values:batchGet`."""
+        client = self._client_factory()
+        spreadsheet = client.open_by_url(dataset.url)
+        sheets = list(dataset.sheets.items())
+        response = spreadsheet.values_batch_get([self._range(sheet.name) for _, sheet in sheets])
+        return {
+            alias: self._to_frame(value_range.get("values", []), sheet)
+            for (alias, sheet), value_range in zip(sheets, response["valueRanges"])
+        }
+
+    @staticmethod
+    def _range(name):
+        return "'" + name.replace("'", "''") + "'"
+
+    @staticmethod
+    def _to_frame(values, sheet):
+        from gspread.utils import fill_gaps, numericise_all
+
+        if not values:
+            return pd.DataFrame()
+        values = fill_gaps(values)
+        if sheet.header_row is None:
+            return pd.DataFrame([numericise_all(row) for row in values[1:]], columns=values[0])
+        if len(values) <= sheet.header_row:
+            return pd.DataFrame()
+        raw_headers = values[sheet.header_row]
+        headers = [h if str(h).strip() != "" else f"col{i}" for i, h in enumerate(raw_headers)]
+        return pd.DataFrame(values[sheet.header_row + 1:], columns=headers)
+
+
+class LocalSource(DataSource):
+    """Espejo local: un archivo (o tabla) por hoja, ya con encabezados resueltos."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def read_dataset(self, dataset):
+        return {alias: self.read_sheet(dataset, sheet) for alias, sheet in dataset.sheets.items()}
+
+    def write_dataset(self, dataset, frames):
+        for alias, sheet in dataset.sheets.items():
+            self.write_sheet(dataset, sheet, frames.get(alias, pd.DataFrame()))
+
+    @abstractmethod
+    def read_sheet(self, dataset, sheet):
+        ...
+
+    @abstractmethod
+    def write_sheet(self, dataset, sheet, df):
+        ...
+
+
+class CsvSource(LocalSource):
+    def _file(self, dataset, sheet):
+        return os.path.join(self.path, dataset.key, f"{sheet.name}.csv")
+
+    def read_sheet(self, dataset, sheet):
+        path = self._file(dataset, sheet)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return pd.DataFrame()
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+    def write_sheet(self, dataset, sheet, df):
+        path = self._file(dataset, sheet)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_csv(path, index=False)
+
+
+class ParquetSource(LocalSource):
+    def _file(self, dataset, sheet):
+        return os.path.join(self.path, dataset.key, f"{sheet.name}.parquet")
+
+    def read_sheet(self, dataset, sheet):
+        path = self._file(dataset, sheet)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_parquet(path)
+
+    def write_sheet(self, dataset, sheet, df):
+        path = self._file(dataset, sheet)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(to_arrow(df), path)
+
+
+class SqliteSource(LocalSource):
+    @staticmethod
+    def _table(dataset, sheet):
+        return f"{dataset.key}__{sheet.name}"
+
+    def read_sheet(self, dataset, sheet):
+        table = self._table(dataset, sheet)
+        with sqlite3.connect(self.path) as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if not exists:
+                return pd.DataFrame()
+            return pd.read_sql_query(f'SELECT * FROM "{table}"', conn)
+
+    def write_sheet(self, dataset, sheet, df):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with sqlite3.connect(self.path) as conn:
+            df.to_sql(self._table(dataset, sheet), conn, if_exists="replace", index=False)
+
+
+LOCAL_BACKENDS = {"csv": CsvSource, "parquet": ParquetSource, "sqlite": SqliteSource}
+
+
+def shape_frames(dataset, frames):
+    """Aplica los tipos que esperan las páginas, sin importar el origen, y agrega
+    las columnas sombra `<alias>_keys` con las claves normalizadas."""
+    shaped = {}
+    for alias, sheet in dataset.sheets.items():
+        df = frames.get(alias)
+        if df is None:
+            df = pd.DataFrame()
+        if sheet.as_text:
+            df = compact_frame(df)
+        for col in sheet.numeric:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+        shaped[alias] = df
+    return with_keys(shaped)
+
+
+def load_dataset(source, dataset):
+    return shape_frames(dataset, source.read_dataset(dataset))
+
+
+def gspread_client_factory(creds_dict):
+    def factory():
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        creds = Credentials.from_service_account_info(dict(creds_dict), scopes=SHEETS_SCOPE)
+        return gspread.authorize(creds)
+    return factory
+
+
+@st.cache_resource
+def get_gspread_client():
+    """Cliente autorizado una sola vez y compartido por páginas, sesiones y hilos de recarga.
+
+    gspread usa una `AuthorizedSession` de requests: reutiliza las conexiones
+    HTTP y renueva el token cuando vence.
+    """
+    return gspread_client_factory(st.secrets["gcp_service_account"])()
+
+
+def source_from_config(config, client_factory=None):
+    """Crea el origen indicado por `backend` (gsheets, csv, parquet o sqlite)."""
+    backend = str(config.get("backend", "gsheets")).lower()
+    if backend == "gsheets":
+        if client_factory is None:
+            raise ValueError("El origen 'gsheets' necesita credenciales de Google.")
+        return GoogleSheetsSource(client_factory)
+    if backend not in LOCAL_BACKENDS:
+        raise ValueError(f"Origen de datos desconocido: {backend!r}")
+    default_path = "data/inventario.db" if backend == "sqlite" else "data"
+    return LOCAL_BACKENDS[backend](config.get("path", default_path))
+
+
+def _secret(key):
+    try:
+        return st.secrets[key]
+    except (KeyError, FileNotFoundError):
+        return {}
+
+
+def datasource_config():
+    """Configuración de `[datasource]` en secrets.toml; INVENTARIO_BACKEND/INVENTARIO_DATA_PATH la sustituyen."""
+    config = dict(_secret("datasource"))
+    if os.environ.get("INVENTARIO_BACKEND"):
+        config["backend"] = os.environ["INVENTARIO_BACKEND"]
+    if os.environ.get("INVENTARIO_DATA_PATH"):
+        config["path"] = os.environ["INVENTARIO_DATA_PATH"]
+    return config
+
+
+def summary_override():
+    """`resumen_web = true` en `[datasource]`: las cifras de la hoja Web sustituyen a las calculadas."""
+    value = datasource_config().get("resumen_web", False)
+    return value if isinstance(value, bool) else str(value).strip().lower() in ("1", "true", "si", "sí", "yes")
+
+
+def get_datasource():
+    config = datasource_config()
+    client_factory = None
+    if str(config.get("backend", "gsheets")).lower() == "gsheets":
+        client_factory = get_gspread_client
+    return source_from_config(config, client_factory)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+STRING_DTYPE = pd.StringDtype("pyarrow")
+MAX_CATEGORY_RATIO = 0.5
+
+
+def compact_column(series, max_category_ratio=MAX_CATEGORY_RATIO):
+    """Columna de texto con el tipo más compacto: categórica si se repiten
+    los valores (ESTATUS, Estado, Marca...), cadena de Arrow si es texto libre."""
+    values = series.fillna("").astype(str)
+    codes, uniques = pd.factorize(values)
+    if len(uniques) > max_category_ratio * len(values):
+        return values.astype(STRING_DTYPE)
+    order = np.argsort(uniques.to_numpy(dtype=object))
+    rank = np.empty(len(order), dtype=codes.dtype)
+    rank[order] = np.arange(len(order))
+    categories = pd.Index(uniques.to_numpy(dtype=object)[order], dtype=object)
+    return pd.Series(pd.Categorical.from_codes(rank[codes], categories), index=series.index, name=series.name)
+
+
+def compact_frame(df):
+    """Todas las columnas como texto compacto; sustituye al `fillna("").astype(str)` de la carga."""
+    if df.empty:
+        return df.fillna("").astype(str)
+    return pd.concat([compact_column(df.iloc[:, i]) for i in range(df.shape[1])], axis=1)
+
+
+def frame_memory(df):
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def memory_report(frames):
+    """Memoria de cada tabla como texto de Python (object) y con tipos compactos."""
+    return [
+        {
+            "tabla": alias,
+            "filas": len(df),
+            "object_bytes": frame_memory(df.astype(object)),
+            "typed_bytes": frame_memory(df),
+        }
+        for alias, df in frames.items()
+    ]
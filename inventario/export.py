@@ -0,0 +1,90 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from inventario.facets import take
+from inventario.timing import stage
+
+CHUNK_ROWS = 5000
+READ_BLOCK = 1 << 20
+
+
+def iter_chunks(df, positions, columns, chunk_rows=CHUNK_ROWS):
+    """Bloques de `chunk_rows` filas de la vista (`positions` sobre `df`, None = todas)."""
+    total = len(df) if positions is None else len(positions)
+    for start in range(0, total, chunk_rows):
+        stop = min(total, start + chunk_rows)
+        yield take(df, np.arange(start, stop) if positions is None else positions[start:stop], columns)
+
+
+def iter_csv(df, positions, columns, chunk_rows=CHUNK_ROWS):
+    """CSV de la vista como bloques de bytes; UTF-8 con BOM para que Excel respete los acentos."""
+    yield "\ufeff".encode("utf-8")
+    yield df[columns].iloc[:0].to_csv(index=False).encode("utf-8")
+    for chunk in iter_chunks(df, positions, columns, chunk_rows):
+        yield chunk.to_csv(index=False, header=False).encode("utf-8")
+
+
+def iter_xlsx(df, positions, columns, chunk_rows=CHUNK_ROWS):
+    """XLSX de la vista como bloques de bytes.
+
+    XlsxWriter en modo `constant_memory` vuelca cada fila a disco al
+    escribirla, así que solo hay un bloque de filas en memoria a la vez.
+    """
+    import xlsxwriter
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False})
+        worksheet = workbook.add_worksheet("Inventario")
+        worksheet.write_row(0, 0, [str(c) for c in columns], workbook.add_format({"bold": True}))
+        row = 1
+        for chunk in iter_chunks(df, positions, columns, chunk_rows):
+            for values in chunk.itertuples(index=False, name=None):
+                worksheet.write_row(row, 0, ["" if pd.isna(v) else v for v in values])
+                row += 1
+        workbook.close()
+        with open(path, "rb") as f:
+            while block := f.read(READ_BLOCK):
+                yield block
+    finally:
+        os.remove(path)
+
+
+FORMATS = {
+    "CSV": (iter_csv, "text/csv", "csv"),
+    "XLSX": (iter_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+
+def spool(blocks):
+    """Vuelca los bloques a un archivo temporal y devuelve su contenido en una sola lectura."""
+    with tempfile.TemporaryFile() as tmp:
+        for block in blocks:
+            tmp.write(block)
+        tmp.seek(0)
+        return tmp.read()
+
+
+def render_export(df, positions, columns, key, file_name):
+    """Exportación de la vista actual (filtros, búsqueda y orden de la tabla).
+
+    El archivo se arma solo al pulsar "Preparar", por bloques y sin copiar la
+    tabla; `st.download_button` conserva el resultado hasta el siguiente rerun.
+    """
+    total = len(df) if positions is None else len(positions)
+    c_formato, c_preparar, c_descargar = st.columns([1, 1.5, 4.7])
+    formato = c_formato.selectbox("Formato", list(FORMATS), key=f"{key}_formato", label_visibility="collapsed")
+    if c_preparar.button(f"Exportar {total:,} filas", key=f"{key}_exportar", disabled=total == 0):
+        writer, mime, extension = FORMATS[formato]
+        with stage("exportar", rows_in=total) as s, st.spinner(f"Generando {formato}..."):
+            data = spool(writer(df, positions, columns))
+            s.bytes = len(data)
+        c_descargar.download_button(
+            f"⬇️ Descargar {file_name}.{extension}", data, file_name=f"{file_name}.{extension}",
+            mime=mime, key=f"{key}_descargar", on_click="ignore"
+        )
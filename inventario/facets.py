@@ -0,0 +1,101 @@
+import numpy as np
+import streamlit as st
+
+from inventario.keys import canonical_key, key_column, key_labels
+
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+def facet_key(value):
+    return canonical_key(value)
+
+
+def count(counts, value):
+    """Filas de `value` en un resultado de `counts`, comparando por clave canónica."""
+    return counts.get(facet_key(value), 0)
+
+
+class FacetIndex:
+    """Posiciones de fila por valor para las columnas de baja cardinalidad.
+
+    Los filtros se resuelven intersectando esos conjuntos (sin copiar el
+    DataFrame) y los conteos por valor salen de un `bincount` sobre los
+    códigos de la selección actual. Los valores se agrupan por su clave
+    canónica; con `keys` (las columnas sombra de la carga) no se vuelve a
+    normalizar ningún texto.
+    """
+
+    def __init__(self, df, columns, keys=None):
+        self.n_rows = len(df)
+        self.codes = {}
+        self.keys = {}
+        self.values = {}
+        self._rows = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            key = keys[col] if keys is not None and col in keys.columns else key_column(df[col])
+            codes = key.cat.codes.to_numpy()
+            categories = key.cat.categories
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+            self.codes[col] = codes
+            self.keys[col] = list(categories)
+            self.values[col] = key_labels(df[col], codes, len(categories))
+            self._rows[col] = {k: order[bounds[i]:bounds[i + 1]] for i, k in enumerate(categories)}
+
+    def __contains__(self, col):
+        return col in self.codes
+
+    def rows(self, col, value):
+        return self._rows[col].get(facet_key(value), EMPTY)
+
+    def select(self, filters):
+        """Intersección de los filtros {columna: valor}; None si no hay ninguno activo.
+
+        Se ignoran los valores vacíos y las columnas que no están en el índice.
+        """
+        result = None
+        for col, value in filters.items():
+            if not value or col not in self:
+                continue
+            result = intersect(result, self.rows(col, value))
+        return result
+
+    def counts(self, col, positions=None):
+        """{clave canónica: filas} de `col` dentro de `positions` (todas las filas si es None).
+
+        Las claves no llevan acentos; se consultan con `count(conteo, valor)`.
+        `values[col]` guarda las etiquetas, solo para mostrar.
+        """
+        if col not in self:
+            return {}
+        codes = self.codes[col] if positions is None else self.codes[col][positions]
+        totals = np.bincount(codes, minlength=len(self.keys[col]))
+        return dict(zip(self.keys[col], totals.tolist()))
+
+    def counts_excluding(self, col, filters, base=None):
+        """Conteos de `col` aplicando todos los filtros menos el suyo."""
+        others = {c: v for c, v in filters.items() if c != col}
+        return self.counts(col, intersect(base, self.select(others)))
+
+
+def intersect(a, b):
+    """Intersección de posiciones ordenadas; None equivale a «todas las filas»."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return np.intersect1d(a, b, assume_unique=True)
+
+
+def take(df, positions, columns):
+    """Filas `positions` y columnas `columns` de `df` en un DataFrame propio (AgGrid lo modifica)."""
+    if positions is None:
+        return df.reindex(columns=columns)
+    return df[columns].take(positions)
+
+
+@st.cache_resource(max_entries=8)
+def get_facet_index(version, columns, _df, _keys=None):
+    return FacetIndex(_df, columns, _keys)
@@ -0,0 +1,93 @@
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+MAX_FIGURES = 64
+
+
+class FigureStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.0
+
+    @property
+    def avg_build_seconds(self):
+        return self.build_seconds / self.misses if self.misses else 0.0
+
+    @property
+    def saved_seconds(self):
+        """Tiempo estimado que se ahorró: aciertos × costo medio de construir una figura."""
+        return self.hits * self.avg_build_seconds
+
+
+_figures = OrderedDict()
+_lock = threading.Lock()
+stats = FigureStats()
+
+
+def _update_hash(h, value):
+    if isinstance(value, pd.DataFrame):
+        h.update(repr(list(value.columns)).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, pd.Series):
+        h.update(repr(value.name).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    else:
+        h.update(repr(value).encode())
+    h.update(b"\x00")
+
+
+def content_hash(*args, **kwargs):
+    """Huella de los argumentos; los DataFrame/Series se comparan por contenido."""
+    h = hashlib.sha1()
+    for value in args:
+        _update_hash(h, value)
+    for name in sorted(kwargs):
+        h.update(name.encode())
+        _update_hash(h, kwargs[name])
+    return h.hexdigest()
+
+
+def memoize_figure(builder):
+    """Reutiliza la figura de Plotly mientras los agregados de entrada no cambien.
+
+    La figura en caché se comparte entre sesiones: no se debe modificar
+    después de construirla.
+    """
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        key = (builder.__module__, builder.__qualname__, content_hash(*args, **kwargs))
+        with _lock:
+            fig = _figures.get(key)
+            if fig is not None:
+                _figures.move_to_end(key)
+                stats.hits += 1
+                return fig
+        start = time.perf_counter()
+        fig = builder(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        with _lock:
+            stats.misses += 1
+            stats.build_seconds += elapsed
+            _figures[key] = fig
+            while len(_figures) > MAX_FIGURES:
+                _figures.popitem(last=False)
+        return fig
+    return wrapper
+
+
+def render_figure_stats():
+    """Con ?debug en la URL, muestra aciertos de la caché de figuras y el tiempo ahorrado."""
+    if "debug" not in st.query_params:
+        return
+    st.caption(
+        f"Figuras: {stats.hits} reutilizadas, {stats.misses} construidas "
+        f"({stats.avg_build_seconds * 1000:.1f} ms de media) · "
+        f"ahorro estimado {stats.saved_seconds:.2f} s"
+    )
@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+import streamlit as st
+from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
+
+from inventario.export import render_export
+from inventario.facets import take
+from inventario.timing import payload_bytes, stage
+
+PAGE_SIZES = [50, 100, 250, 500]
+
+CUSTOM_CSS = {
+    ".ag-root-wrapper": {"background-color": "transparent !important", "border": "1px solid #333e5d !important"},
+    ".ag-header, .ag-row, .ag-cell": {"background-color": "transparent !important", "color": "white !important", "border": "1px solid #333e5d !important", "font-size": "11px !important"},
+    ".ag-header-cell-text": {"color": "white !important", "font-weight": "bold !important"}
+}
+
+
+@st.cache_resource(max_entries=32)
+def get_sort_rank(version, column, _df):
+    """Posición de cada fila de `_df` al ordenar por `column`, una vez por versión de datos."""
+    order = _df[column].argsort(kind="stable").to_numpy()
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank
+
+
+def sort_positions(positions, rank, descending=False):
+    """Ordena una selección usando el rango precalculado: O(k log k) sobre k filas seleccionadas."""
+    if positions is None:
+        positions = np.arange(len(rank))
+    order = np.argsort(rank[positions], kind="stable")
+    if descending:
+        order = order[::-1]
+    return positions[order]
+
+
+def page_window(positions, total, page, page_size):
+    start = (page - 1) * page_size
+    stop = min(total, start + page_size)
+    if positions is None:
+        return np.arange(start, stop)
+    return positions[start:stop]
+
+
+def render_paged_grid(df, positions, columns, version, key, grid_key=None, height=700, export_name=None):
+    """Muestra en AgGrid solo la página visible de `df` (filas `positions`, None = todas).
+
+    El orden y la paginación se resuelven en el servidor sobre la tabla en
+    caché; al navegador solo viaja la página actual. `key` identifica los
+    controles de la tabla y `grid_key` (por defecto igual) el componente AgGrid.
+    Con `export_name` se ofrece descargar la vista completa en ese orden.
+    """
+    total = len(df) if positions is None else len(positions)
+    c_orden, c_dir, c_tam, c_pag, c_info = st.columns([3, 1.2, 1.2, 1.2, 2])
+
+    orden = c_orden.selectbox(
+        "Ordenar por", [None] + list(columns), key=f"{key}_orden",
+        format_func=lambda c: "Orden original" if c is None else c
+    )
+    descendente = c_dir.toggle("Descendente", key=f"{key}_desc", disabled=orden is None)
+    page_size = c_tam.selectbox("Filas por página", PAGE_SIZES, index=1, key=f"{key}_tam")
+    n_pages = max(1, math.ceil(total / page_size))
+
+    firma = (total, orden, descendente, page_size)
+    if st.session_state.get(f"{key}_firma") != firma:
+        st.session_state[f"{key}_firma"] = firma
+        st.session_state[f"{key}_pagina"] = 1
+    page = c_pag.number_input("Página", min_value=1, max_value=n_pages, step=1, key=f"{key}_pagina")
+
+    if orden is not None:
+        positions = sort_positions(positions, get_sort_rank(version, orden, df), descendente)
+    if export_name:
+        render_export(df, positions, columns, key, export_name)
+    window = page_window(positions, total, page, page_size)
+    inicio = (page - 1) * page_size
+    c_info.markdown(f"<div style='margin-top:32px;'>Filas {min(total, inicio + 1):,}–{inicio + len(window):,} de {total:,}</div>", unsafe_allow_html=True)
+
+    with stage("tabla_opciones", rows_in=total) as s:
+        df_pagina = take(df, window, columns)
+        gb = GridOptionsBuilder.from_dataframe(df_pagina)
+        gb.configure_default_column(editable=False, resizable=False, sortable=False, filter=False, minWidth=80)
+        gb.configure_selection(selection_mode="single", use_checkbox=False)
+        gb.configure_grid_options(domLayout="normal", suppressHorizontalScroll=False, rowHeight=30)
+        gridOptions = gb.build()
+        s.rows_out = len(df_pagina)
+
+    with stage("tabla", rows_in=len(df_pagina)) as s:
+        if s.measure:
+            s.bytes = payload_bytes(df_pagina)
+        return AgGrid(
+            df_pagina, gridOptions=gridOptions, update_mode=GridUpdateMode.MODEL_CHANGED,
+            fit_columns_on_grid_load=False, allow_unsafe_jscode=False, theme="streamlit", height=height,
+            data_return_mode=DataReturnMode.AS_INPUT,
+            key=grid_key or key,
+            custom_css=CUSTOM_CSS
+        )
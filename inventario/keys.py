@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from inventario.text import normalize_text
+
+KEYS_SUFFIX = "_keys"
+
+
+def canonical_key(value):
+    """Forma con la que se comparan los valores: sin espacios extremos, sin acentos y en mayúsculas."""
+    return normalize_text(value).upper()
+
+
+def key_column(series):
+    """Claves canónicas de `series` como categórica; se normalizan solo los valores distintos."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    keys = np.array([canonical_key(v) for v in np.asarray(uniques, dtype=object)], dtype=object)
+    key_codes, key_uniques = pd.factorize(keys)
+    return pd.Series(
+        pd.Categorical.from_codes(key_codes[codes], pd.Index(key_uniques, dtype=object)),
+        index=series.index, name=series.name
+    )
+
+
+def key_labels(series, codes, n, upper=True):
+    """Etiqueta de cada clave: la primera variante que aparece, sin espacios (y en mayúsculas)."""
+    labels = [""] * n
+    present, first = np.unique(codes, return_index=True)
+    for code, value in zip(present, np.asarray(series.take(first), dtype=object)):
+        labels[code] = str(value).strip().upper() if upper else str(value).strip()
+    return labels
+
+
+def key_frame(df):
+    """Columnas sombra con la clave de cada columna categórica o de texto de Python."""
+    columns = [
+        i for i, dtype in enumerate(df.dtypes)
+        if isinstance(dtype, pd.CategoricalDtype) or dtype == object
+    ]
+    if not columns:
+        return pd.DataFrame(index=df.index)
+    return pd.concat([key_column(df.iloc[:, i]) for i in columns], axis=1)
+
+
+def with_keys(frames):
+    """Agrega `<alias>_keys` a cada tabla que aún no lo tenga (una vez por versión de datos)."""
+    frames = dict(frames)
+    for alias in [a for a in frames if not a.endswith(KEYS_SUFFIX)]:
+        if alias + KEYS_SUFFIX not in frames:
+            frames[alias + KEYS_SUFFIX] = key_frame(frames[alias])
+    return frames
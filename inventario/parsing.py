@@ -0,0 +1,101 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+_FAST_PATH = r"^[\x20-\x7e\t\n\x0b\x0c\r]*$"
+_VALID_NUMBER = r"^-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)$"
+
+
+def parse_numeric_value(x):
+    """Convierte cadenas como '$1,200.50' o '1.200,50' a float; devuelve NaN si no puede."""
+    if pd.isna(x):
+        return float("nan")
+    s = str(x).strip()
+    if s == "" or s.upper() == "N/A":
+        return float("nan")
+    if '.' in s and ',' in s:
+        if s.rfind(',') > s.rfind('.'):
+            s = s.replace('.', '')
+            s = s.replace(',', '.')
+        else:
+            s = s.replace(',', '')
+    else:
+        if ',' in s and '.' not in s:
+            s = s.replace(',', '.')
+    s = re.sub(r'[^\d\.\-]', '', s)
+    try:
+        return float(s)
+    except Exception:
+        return float("nan")
+
+
+def _parse_values(values):
+    """Aplica las reglas de `parse_numeric_value` a un arreglo de valores no nulos con Arrow."""
+    arr = pa.array([str(v) for v in values], type=pa.string())
+    fast = pc.match_substring_regex(arr, _FAST_PATH)
+    s = pc.ascii_trim_whitespace(arr)
+    blank = pc.or_(pc.equal(s, ""), pc.equal(pc.ascii_upper(s), "N/A"))
+
+    has_dot = pc.match_substring(s, ".")
+    has_comma = pc.match_substring(s, ",")
+    both = pc.and_(has_dot, has_comma)
+    reversed_s = pc.utf8_reverse(s)
+    comma_last = pc.less(pc.find_substring(reversed_s, ","), pc.find_substring(reversed_s, "."))
+
+    s = pc.if_else(pc.and_(both, comma_last), pc.replace_substring(pc.replace_substring(s, ".", ""), ",", "."), s)
+    s = pc.if_else(pc.and_(both, pc.invert(comma_last)), pc.replace_substring(s, ",", ""), s)
+    s = pc.if_else(pc.and_(has_comma, pc.invert(has_dot)), pc.replace_substring(s, ",", "."), s)
+    s = pc.replace_substring_regex(s, r"[^0-9.\-]", "")
+
+    valid = pc.and_(pc.and_(fast, pc.invert(blank)), pc.match_substring_regex(s, _VALID_NUMBER))
+    valid = valid.to_numpy(zero_copy_only=False)
+    result = np.full(len(values), np.nan)
+    result[valid] = pc.cast(pc.filter(s, valid), pa.float64()).to_numpy()
+
+    slow = np.flatnonzero(~fast.to_numpy(zero_copy_only=False))
+    for i in slow:
+        result[i] = parse_numeric_value(values[i])
+    return result
+
+
+def _factorize(series):
+    """(códigos, valores distintos como texto); los nulos llevan el código -1.
+
+    Se usa `dictionary_encode` de Arrow y no `pd.factorize`: la tabla hash de
+    cadenas de pandas corta en el primer carácter nulo y junta "\x0068" con
+    "\x00a2". Los valores que no son texto se pasan con `str`, como en
+    `parse_numeric_value`.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), np.array([str(v) for v in series.cat.categories], dtype=object)
+    try:
+        arr = pa.array(series.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        arr = pa.array([None if pd.isna(v) else str(v) for v in series.to_numpy(dtype=object)], type=pa.string())
+    encoded = pc.dictionary_encode(arr)
+    codes = encoded.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+    return codes, encoded.dictionary.to_numpy(zero_copy_only=False)
+
+
+def parse_numeric_series(series):
+    """Versión vectorizada de `parse_numeric_value` sobre una Serie completa.
+
+    Se convierten solo los valores distintos y el resultado se reparte con
+    los códigos de `_factorize` (el código -1 de los nulos cae en el NaN
+    final). Las cadenas ASCII pasan por kernels de
+    Arrow con las mismas reglas; el resto (dígitos Unicode, caracteres de
+    control) usa la función por celda, así que la salida es idéntica.
+    """
+    codes, uniques = _factorize(series)
+    parsed = np.append(_parse_values(np.asarray(uniques, dtype=object)), np.nan)
+    return pd.Series(parsed[codes], index=series.index, name=series.name)
+
+
+@st.cache_resource(max_entries=16)
+def get_numeric_column(version, column, _df):
+    """Columna `column` de `_df` ya convertida a float, una vez por versión de datos."""
+    return parse_numeric_series(_df[column])
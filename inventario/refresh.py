@@ -0,0 +1,188 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+import streamlit as st
+
+from inventario.changes import ChangeLog
+from inventario.datasource import DATASETS, datasource_config, get_datasource, load_dataset, summary_override
+from inventario.keys import with_keys
+from inventario.snapshots import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    frames: dict
+    version: str
+    loaded_at: float
+    origin: str = "live"
+
+
+def frames_version(frames):
+    """Huella del contenido: la misma información produce la misma versión."""
+    h = hashlib.sha1()
+    for alias in sorted(frames):
+        df = frames[alias]
+        h.update(alias.encode())
+        h.update(repr(list(df.columns)).encode())
+        if not df.empty:
+            h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+class SnapshotRefresher:
+    """Sirve la última carga buena y la renueva en segundo plano cada `interval` segundos.
+
+    Solo la primera llamada a `get()` espera a la carga; después se devuelve
+    siempre el snapshot vigente, que el hilo sustituye de forma atómica. Con un
+    `store`, cada carga se guarda en disco y al arrancar se sirve la última
+    copia mientras se concilia con los datos vivos. Con `changes`, cada versión
+    nueva se compara con la vigente y la diferencia queda en el historial.
+    `stop()` termina el hilo y suelta el snapshot.
+    """
+
+    def __init__(self, loader, interval, store=None, changes=None):
+        self._loader = loader
+        self.interval = interval
+        self.store = store
+        self.changes = changes
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_error = None
+        self.next_refresh_at = None
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def get(self):
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._restore_or_reload()
+            self._start()
+        return self._snapshot
+
+    def prefetch(self):
+        """Inicia la primera carga en segundo plano, p. ej. la de la otra página, sin esperarla."""
+        if self._snapshot is None and not self._lock.locked():
+            threading.Thread(target=self._prefetch, name="inventario-prefetch", daemon=True).start()
+
+    def _prefetch(self):
+        try:
+            self.get()
+        except Exception:
+            logger.warning("No se pudo precargar el inventario", exc_info=True)
+
+    def stop(self):
+        """Detiene la recarga en segundo plano, p. ej. cuando otro refresher lo sustituye."""
+        self._stop.set()
+        self._snapshot = None
+
+    def _start(self):
+        if self._stop.is_set():
+            return
+        if self._thread is None or not self._thread.is_alive():
+            if self.next_refresh_at is None:
+                self.next_refresh_at = time.time() + self.interval
+            self._thread = threading.Thread(target=self._run, name="inventario-refresh", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(max(0.0, self.next_refresh_at - time.time())):
+            try:
+                with self._lock:
+                    self._reload()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+            self.next_refresh_at = time.time() + self.interval
+        self._snapshot = None
+
+    def _restore_or_reload(self):
+        restored = self.store.load_latest() if self.store is not None else None
+        if restored is None:
+            self._reload()
+            return
+        frames, version, loaded_at = restored
+        self._snapshot = Snapshot(with_keys(frames), version, loaded_at, origin="disco")
+        self.next_refresh_at = time.time()
+
+    def _reload(self):
+        frames = self._loader()
+        version = frames_version(frames)
+        current = self._snapshot
+        if current is not None and current.version == version:
+            frames = current.frames
+        snapshot = Snapshot(frames, version, time.time())
+        if self.changes is not None and current is not None and current.version != version:
+            try:
+                self.changes.record(current, snapshot)
+            except Exception:
+                logger.warning("No se pudo registrar el historial de cambios", exc_info=True)
+        self._snapshot = snapshot
+        if self.store is not None:
+            try:
+                self.store.save(self._snapshot)
+            except Exception:
+                logger.warning("No se pudo guardar la copia local del inventario", exc_info=True)
+
+
+def snapshot_dir():
+    """Carpeta de copias locales; INVENTARIO_SNAPSHOT_DIR="" las desactiva."""
+    if "INVENTARIO_SNAPSHOT_DIR" in os.environ:
+        return os.environ["INVENTARIO_SNAPSHOT_DIR"]
+    return datasource_config().get("snapshot_dir", ".cache/snapshots")
+
+
+_active = {}
+_active_lock = threading.Lock()
+
+
+@st.cache_resource
+def get_refresher(dataset_key):
+    """Un refresher por libro; si se limpia la caché, el nuevo detiene al anterior."""
+    dataset = DATASETS[dataset_key].with_overrides(summary_override())
+    path = snapshot_dir()
+    store = SnapshotStore(path, dataset_key) if path else None
+    changes = ChangeLog(dataset_key, os.path.join(path, dataset_key, "cambios") if path else None)
+    refresher = SnapshotRefresher(lambda: load_dataset(get_datasource(), dataset), dataset.refresh_interval, store, changes)
+    with _active_lock:
+        previous = _active.get(dataset_key)
+        _active[dataset_key] = refresher
+    if previous is not None:
+        previous.stop()
+    return refresher
+
+
+def _humanize(seconds):
+    seconds = int(max(0, seconds))
+    if seconds < 60:
+        return f"{seconds} s"
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes} min"
+    return f"{minutes // 60} h {minutes % 60} min"
+
+
+def render_freshness(refresher):
+    snapshot = refresher.snapshot
+    if snapshot is None:
+        return
+    now = time.time()
+    texto = f"🕒 Datos de hace {_humanize(now - snapshot.loaded_at)}"
+    if snapshot.origin == "disco":
+        texto += " (copia local; actualizando con los datos en vivo)"
+    if refresher.next_refresh_at:
+        texto += f" · próxima actualización en {_humanize(refresher.next_refresh_at - now)}"
+    st.caption(texto)
+    if refresher.last_error is not None:
+        st.warning(f"No se pudo actualizar el inventario; se muestran los últimos datos válidos. ({refresher.last_error})")
@@ -0,0 +1,140 @@
+import logging
+from dataclasses import dataclass
+
+import streamlit as st
+
+from inventario.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Field:
+    """Campo canónico y las reglas para encontrarlo entre los encabezados.
+
+    Se prueban en orden: coincidencia exacta con `exact` (normalizados),
+    encabezados que contengan todos los `contains_all`, los que contengan
+    alguno de `contains_any` y, con `substring`, inclusión en cualquier sentido.
+    """
+    name: str
+    exact: tuple = ()
+    contains_all: tuple = ()
+    contains_any: tuple = ()
+    substring: bool = False
+
+    def match(self, normalized_to_real):
+        for candidate in self.exact or (normalize_text(self.name),):
+            if candidate in normalized_to_real:
+                return normalized_to_real[candidate]
+        if self.contains_all:
+            for nreal, realcol in normalized_to_real.items():
+                if all(part in nreal for part in self.contains_all):
+                    return realcol
+        if self.contains_any:
+            for nreal, realcol in normalized_to_real.items():
+                if any(part in nreal for part in self.contains_any):
+                    return realcol
+        if self.substring:
+            nd = normalize_text(self.name)
+            for nreal, realcol in normalized_to_real.items():
+                if nd in nreal or nreal in nd:
+                    return realcol
+        return None
+
+
+@dataclass(frozen=True)
+class ResolvedSchema:
+    mapping: dict
+    unmatched: tuple
+
+    def get(self, name):
+        return self.mapping.get(name)
+
+    def columns(self, names):
+        """Columnas reales de `names` que sí existen, sin repetir y en ese orden."""
+        return list(dict.fromkeys(self.mapping[n] for n in names if n in self.mapping))
+
+
+COLUMNAS_TELEFONOS = [
+    "Región", "Número de Teléfono", "Plan Y Servicios contratados", "Ciudad", "Estado",
+    "Empleado", "Puesto", "Departamento", "Marca", "Modelo", "IMEI", "N° SERIE"
+]
+
+SCHEMAS = {
+    "computo": [
+        Field("ESTATUS"),
+        Field("ESTADO"),
+        Field("N° SERIE", contains_all=("serie",)),
+        Field("USUARIO", exact=("usuario", "empleado", "responsable")),
+    ],
+    "telefonos": [
+        Field("Estatus", exact=("estatus", "estado", "status")),
+        Field(
+            "Costo del plan", exact=("plan y servicios contratados",),
+            contains_all=("plan", "servici"), contains_any=("plan", "servici", "servicios")
+        ),
+        *[Field(name, substring=True) for name in COLUMNAS_TELEFONOS],
+    ],
+}
+
+
+# Prefijos de búsqueda por campo ("imei:...") -> (campo canónico, tipo de clave).
+CAMPOS_BUSQUEDA = {
+    "computo": {
+        "serie": ("N° SERIE", "id"),
+        "usuario": ("USUARIO", "nombre"),
+        "empleado": ("USUARIO", "nombre"),
+    },
+    "telefonos": {
+        "imei": ("IMEI", "id"),
+        "serie": ("N° SERIE", "id"),
+        "tel": ("Número de Teléfono", "telefono"),
+        "telefono": ("Número de Teléfono", "telefono"),
+        "numero": ("Número de Teléfono", "telefono"),
+        "empleado": ("Empleado", "nombre"),
+        "usuario": ("Empleado", "nombre"),
+    },
+}
+
+
+def search_fields(schema_key, schema):
+    """{prefijo: (columna real, tipo de clave)} de los campos de búsqueda que tiene la hoja."""
+    return {
+        prefix: (schema.get(name), kind)
+        for prefix, (name, kind) in CAMPOS_BUSQUEDA[schema_key].items()
+        if schema.get(name)
+    }
+
+
+# Campos que identifican a un equipo entre cargas, en orden de preferencia.
+CLAVES_ESTABLES = {
+    "computo": ("N° SERIE",),
+    "telefonos": ("IMEI", "N° SERIE"),
+}
+
+
+def match_schema(schema_key, headers):
+    """Relaciona encabezados con campos canónicos (sin caché; sirve fuera de una sesión)."""
+    normalized_to_real = {normalize_text(c): c for c in headers}
+    mapping = {}
+    for field in SCHEMAS[schema_key]:
+        realcol = field.match(normalized_to_real)
+        if realcol is not None:
+            mapping[field.name] = realcol
+    unmatched = tuple(f.name for f in SCHEMAS[schema_key] if f.name not in mapping)
+    return ResolvedSchema(mapping, unmatched)
+
+
+@st.cache_resource(max_entries=16)
+def resolve_schema(schema_key, headers):
+    """Como `match_schema`, pero una vez por firma de encabezados y avisando lo que falta."""
+    schema = match_schema(schema_key, headers)
+    if schema.unmatched and headers:
+        logger.warning("Hoja '%s': no se encontraron las columnas %s", schema_key, ", ".join(schema.unmatched))
+    return schema
+
+
+def render_schema_report(schema):
+    """Con ?debug en la URL, lista los campos que no se encontraron en la hoja."""
+    if "debug" in st.query_params and schema.unmatched:
+        st.caption("Columnas no encontradas: " + ", ".join(schema.unmatched))
@@ -0,0 +1,272 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+from inventario.text import normalize_text
+
+EMPTY = np.empty(0, dtype=np.int64)
+FIELD_QUERY = re.compile(r"^\s*([^\s:]+)\s*:\s*(.*\S)\s*$")
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """Resultado de una consulta: sus términos, los tokens de cada uno y las filas."""
+    terms: list
+    token_ids: dict
+    rows: np.ndarray
+    source: tuple = ()
+
+
+class SearchIndex:
+    """Índice invertido para el cuadro 🔍 Buscar.
+
+    Cada celda se normaliza con `normalize_text` y se parte en tokens por
+    espacios. Un término de búsqueda (sin espacios) aparece en el texto de la
+    fila si y solo si es subcadena de alguno de sus tokens, así que basta con
+    buscar el término en el vocabulario (con ayuda de trigramas) y unir las
+    filas de los tokens que lo contienen. Varios términos se combinan con AND.
+    """
+
+    CACHE_SIZE = 512
+
+    def __init__(self, df, columns=None):
+        columns = list(df.columns if columns is None else columns)
+        self.n_rows = len(df)
+        postings = defaultdict(list)
+        for col in columns:
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+            uniques = np.asarray(uniques, dtype=object)
+            if len(uniques) == 0:
+                continue
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            for code, value in enumerate(uniques):
+                rows = order[bounds[code]:bounds[code + 1]]
+                for token in set(normalize_text(value).split()):
+                    postings[token].append(rows)
+
+        self.tokens = list(postings)
+        self.vocabulary = pa.array(self.tokens, type=pa.string())
+        token_rows = [
+            np.unique(np.concatenate(parts)) if len(parts) > 1 else np.sort(parts[0])
+            for parts in postings.values()
+        ]
+        self.offsets = np.zeros(len(token_rows) + 1, dtype=np.int64)
+        np.cumsum([len(rows) for rows in token_rows], out=self.offsets[1:])
+        self.postings = np.concatenate(token_rows) if token_rows else EMPTY
+        trigrams = defaultdict(list)
+        for token_id, token in enumerate(self.tokens):
+            for gram in {token[i:i + 3] for i in range(len(token) - 2)}:
+                trigrams[gram].append(token_id)
+        self.trigrams = {gram: np.array(ids, dtype=np.int64) for gram, ids in trigrams.items()}
+        self._cache = {}
+
+    def search(self, query):
+        """Posiciones (ordenadas) de las filas que contienen todos los términos de `query`."""
+        return self.refine(query).rows
+
+    def refine(self, query, previous=None):
+        """Como `search`, pero parte de `previous` (el resultado de la consulta anterior).
+
+        Si cada término anterior es subcadena de algún término nuevo ("iph" ->
+        "iphone", "perez" -> "perez la"), las filas nuevas son un subconjunto
+        de las anteriores: se parte de ellas y cada término solo revisa los
+        tokens que ya contenían su término anterior. Si no, se busca en todo
+        el índice.
+        """
+        terms = sorted(set(normalize_text(query).split()), key=len, reverse=True)
+        if previous is not None and terms == previous.terms:
+            return previous
+        if not terms:
+            return SearchResult(terms, {}, np.arange(self.n_rows))
+        narrowed = previous is not None and bool(previous.terms) and all(
+            any(old in term for term in terms) for old in previous.terms
+        )
+        if narrowed and len(previous.rows) == 0:
+            return SearchResult(terms, {}, EMPTY)
+        result = previous.rows if narrowed else None
+        token_ids = {}
+        for term in terms:
+            if narrowed and term in previous.token_ids:
+                token_ids[term] = previous.token_ids[term]
+                continue
+            within = parent = None
+            if narrowed:
+                parent = next((old for old in previous.terms if old in term), None)
+                within = previous.token_ids.get(parent)
+            token_ids[term], rows = self._term_rows(term, within)
+            if result is None or (narrowed and result is previous.rows and previous.terms == [parent]):
+                # Las filas de un término que extiende la única consulta anterior ya están contenidas en ella.
+                result = rows
+            else:
+                result = np.intersect1d(result, rows, assume_unique=True)
+            if len(result) == 0:
+                break
+        return SearchResult(terms, token_ids, result)
+
+    def _term_rows(self, term, within=None):
+        cached = self._cache.get(term)
+        if cached is None:
+            token_ids = self._matching_tokens(term, self._candidate_tokens(term) if within is None else within)
+            if len(token_ids) == 0:
+                rows = EMPTY
+            elif len(token_ids) == 1:
+                rows = self.postings[self.offsets[token_ids[0]]:self.offsets[token_ids[0] + 1]]
+            else:
+                rows = self._union(token_ids)
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.clear()
+            cached = self._cache[term] = (token_ids, rows)
+        return cached
+
+    def _union(self, token_ids):
+        """Filas (ordenadas, sin repetir) de cualquiera de los tokens `token_ids`."""
+        starts = self.offsets[token_ids]
+        lengths = self.offsets[token_ids + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.postings[positions]] = True
+        return np.flatnonzero(mask)
+
+    def _matching_tokens(self, term, candidates):
+        """Ids de los tokens de `candidates` (todos si es None) que contienen `term`."""
+        if candidates is None:
+            return np.flatnonzero(pc.match_substring(self.vocabulary, term).to_numpy(zero_copy_only=False))
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if len(candidates) == 0:
+            return candidates
+        hits = pc.match_substring(self.vocabulary.take(candidates), term)
+        return candidates[hits.to_numpy(zero_copy_only=False)]
+
+    def _candidate_tokens(self, term):
+        if len(term) < 3:
+            return None
+        candidates = None
+        for gram in {term[i:i + 3] for i in range(len(term) - 2)}:
+            ids = self.trigrams.get(gram)
+            if ids is None:
+                return []
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+        return candidates
+
+
+def identifier_key(value):
+    """IMEI, serie...: sin acentos, en minúsculas y sin espacios, guiones, puntos ni diagonales."""
+    return re.sub(r"[\s\-./]", "", normalize_text(value))
+
+
+def phone_key(value):
+    """Solo los dígitos del número, y de ellos los últimos 10 (sin lada internacional)."""
+    return re.sub(r"\D", "", str(value))[-10:]
+
+
+def name_key(value):
+    return " ".join(normalize_text(value).split())
+
+
+KEY_KINDS = {"id": identifier_key, "telefono": phone_key, "nombre": name_key}
+
+
+class KeyIndex:
+    """Filas por clave normalizada de una columna de identificadores.
+
+    La búsqueda exacta es una consulta a la tabla hash de un `pd.Index`; si no
+    hay coincidencia exacta se buscan las claves que contienen el valor (IMEI
+    o teléfono incompletos, parte de un nombre) con un kernel de Arrow.
+    """
+
+    def __init__(self, series, kind):
+        self.key_func = KEY_KINDS[kind]
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        keys = np.array([self.key_func(v) for v in np.asarray(uniques, dtype=object)], dtype=object)
+        key_codes, key_uniques = pd.factorize(keys)
+        self.row_codes = key_codes[codes]
+        self.order = np.argsort(self.row_codes, kind="stable")
+        self.bounds = np.searchsorted(self.row_codes[self.order], np.arange(len(key_uniques) + 1))
+        self.keys = pd.Index(key_uniques, dtype=object)
+        self.keys.is_unique  # arma la tabla hash ahora y no en la primera consulta
+        self.vocabulary = pa.array(list(key_uniques), type=pa.string())
+
+    def get(self, value):
+        """Posiciones (ordenadas) de las filas cuya clave es igual a la de `value`."""
+        key = self.key_func(value)
+        try:
+            code = self.keys.get_loc(key) if key else -1
+        except KeyError:
+            code = -1
+        if code < 0:
+            return EMPTY
+        return self.order[self.bounds[code]:self.bounds[code + 1]]
+
+    def contains(self, value):
+        """Posiciones de las filas cuya clave contiene la de `value`."""
+        key = self.key_func(value)
+        if not key:
+            return EMPTY
+        hits = np.flatnonzero(pc.match_substring(self.vocabulary, key).to_numpy(zero_copy_only=False))
+        if len(hits) == 0:
+            return EMPTY
+        return np.flatnonzero(np.isin(self.row_codes, hits))
+
+    def lookup(self, value):
+        rows = self.get(value)
+        return rows if len(rows) else self.contains(value)
+
+
+def parse_field_query(query, fields):
+    """(columna, tipo, valor) si `query` empieza con un prefijo de `fields` ("imei:..."); si no, None."""
+    match = FIELD_QUERY.match(query)
+    if match is None:
+        return None
+    field = fields.get(normalize_text(match.group(1)))
+    if field is None:
+        return None
+    return (*field, match.group(2))
+
+
+@st.cache_resource(max_entries=8)
+def get_search_index(version, columns, _df):
+    """Un índice por versión de datos y conjunto de columnas."""
+    return SearchIndex(_df, list(columns))
+
+
+@st.cache_resource(max_entries=16)
+def get_key_index(version, column, kind, _df):
+    """Índice hash de `column`, una vez por versión de datos."""
+    return KeyIndex(_df[column], kind)
+
+
+def search_help(fields):
+    """Texto de ayuda del buscador con los prefijos de campo disponibles."""
+    if not fields:
+        return None
+    return "Para buscar un identificador exacto escribe campo:valor (" + ", ".join(f"{p}:" for p in fields) + ")."
+
+
+def search_rows(page, version, columns, df, query, fields=None):
+    """Filas de `query` en esta sesión, refinando la búsqueda anterior de la página.
+
+    Se guarda en `st.session_state` la última consulta con sus filas; una
+    consulta equivalente (mayúsculas, acentos, espacios) no se vuelve a evaluar.
+    Las consultas con prefijo de campo (`fields`, p. ej. "imei:356938...") van
+    directo al índice hash de esa columna.
+    """
+    key = f"_busqueda_{page}"
+    parsed = parse_field_query(query, fields or {})
+    if parsed is not None:
+        column, kind, value = parsed
+        st.session_state.pop(key, None)
+        return get_key_index(version, column, kind, df).lookup(value)
+    source = (version, tuple(columns))
+    previous = st.session_state.get(key)
+    if previous is not None and previous.source != source:
+        previous = None
+    result = get_search_index(version, source[1], df).refine(query, previous)
+    st.session_state[key] = replace(result, source=source)
+    return result.rows
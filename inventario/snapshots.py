@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from inventario.dtypes import STRING_DTYPE
+
+logger = logging.getLogger(__name__)
+
+LATEST = "LATEST"
+MANIFEST = "manifest.json"
+
+
+def to_arrow(df):
+    """Convierte a tabla Arrow; las columnas con tipos mezclados se guardan como texto."""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = df[col].where(df[col].notna(), "").astype(str)
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _from_arrow(table):
+    """DataFrame de una tabla guardada; el texto libre vuelve a cadenas de Arrow."""
+    df = table.to_pandas()
+    for i, dtype in enumerate(df.dtypes):
+        if isinstance(dtype, pd.StringDtype) and dtype != STRING_DTYPE:
+            df.isetitem(i, df.iloc[:, i].astype(STRING_DTYPE))
+    return df
+
+
+class SnapshotStore:
+    """Copias versionadas de cada carga en disco, en formato Arrow IPC sin comprimir.
+
+    Cada versión vive en `<path>/<dataset>/<version>/` y el archivo LATEST
+    apunta a la más reciente. Se leen con memory-mapping al arrancar.
+    """
+
+    def __init__(self, path, dataset_key, keep=3):
+        self.root = os.path.join(path, dataset_key)
+        self.keep = keep
+
+    def save(self, snapshot):
+        version_dir = os.path.join(self.root, snapshot.version)
+        if not os.path.exists(os.path.join(version_dir, MANIFEST)):
+            tmp_dir = f"{version_dir}.tmp-{os.getpid()}"
+            os.makedirs(tmp_dir, exist_ok=True)
+            files = {}
+            for alias, df in snapshot.frames.items():
+                files[alias] = f"{alias}.arrow"
+                feather.write_feather(to_arrow(df), os.path.join(tmp_dir, files[alias]), compression="uncompressed")
+            with open(os.path.join(tmp_dir, MANIFEST), "w", encoding="utf-8") as f:
+                json.dump({"version": snapshot.version, "loaded_at": snapshot.loaded_at, "files": files}, f)
+            shutil.rmtree(version_dir, ignore_errors=True)
+            os.replace(tmp_dir, version_dir)
+        self._write_latest(snapshot.version)
+        self._prune(snapshot.version)
+
+    def load_latest(self):
+        """Devuelve (frames, version, loaded_at) de la última copia, o None si no hay."""
+        try:
+            with open(os.path.join(self.root, LATEST), encoding="utf-8") as f:
+                version = f.read().strip()
+            version_dir = os.path.join(self.root, version)
+            with open(os.path.join(version_dir, MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+            frames = {
+                alias: _from_arrow(feather.read_table(os.path.join(version_dir, name), memory_map=True))
+                for alias, name in manifest["files"].items()
+            }
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("No se pudo leer la copia local del inventario en %s", self.root, exc_info=True)
+            return None
+        return frames, manifest["version"], manifest["loaded_at"]
+
+    def _write_latest(self, version):
+        tmp = os.path.join(self.root, f"{LATEST}.tmp-{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(self.root, LATEST))
+
+    def _prune(self, current):
+        versions = [
+            (os.path.getmtime(os.path.join(self.root, name)), name)
+            for name in os.listdir(self.root)
+            if os.path.isfile(os.path.join(self.root, name, MANIFEST))
+        ]
+        for _, name in sorted(versions, reverse=True)[self.keep:]:
+            if name != current:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
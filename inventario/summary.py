@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from inventario.keys import canonical_key, key_column, key_labels
+
+EXCLUDED_KEYS = ("", "TOTAL")
+
+
+@dataclass(frozen=True)
+class Summary:
+    """Agregados de la tabla de detalle: filas de la hoja y conteos por valor de cada columna.
+
+    `counts[col]` tiene las columnas Clave, Etiqueta y Equipos, ordenadas por
+    Etiqueta y sin las claves vacías ni las filas de TOTAL que traen algunas hojas.
+    """
+    total: int
+    counts: dict
+
+    def count(self, col, value):
+        """Filas de `col` iguales a `value` (comparando claves canónicas)."""
+        conteo = self.counts.get(col)
+        if conteo is None:
+            return 0
+        hits = conteo.loc[conteo["Clave"] == canonical_key(value), "Equipos"]
+        return int(hits.iloc[0]) if len(hits) else 0
+
+    def total_of(self, col):
+        """Filas con valor en `col`: sin las vacías ni la de TOTAL, igual que los conteos."""
+        conteo = self.counts.get(col)
+        return self.total if conteo is None else int(conteo["Equipos"].sum())
+
+    def frame(self, col):
+        """Etiqueta/Equipos de `col`, listo para las gráficas."""
+        conteo = self.counts.get(col)
+        if conteo is None:
+            return pd.DataFrame({"Etiqueta": [], "Equipos": []})
+        return conteo[["Etiqueta", "Equipos"]]
+
+
+def summarize(df, columns, keys=None):
+    """Un `bincount` por columna sobre los códigos de sus claves; no se transforma texto."""
+    counts = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        key = keys[col] if keys is not None and col in keys.columns else key_column(df[col])
+        codes = key.cat.codes.to_numpy()
+        categories = key.cat.categories
+        conteo = pd.DataFrame({
+            "Clave": np.asarray(categories, dtype=object),
+            "Etiqueta": key_labels(df[col], codes, len(categories), upper=False),
+            "Equipos": np.bincount(codes, minlength=len(categories)),
+        })
+        conteo = conteo[~conteo["Clave"].isin(EXCLUDED_KEYS) & (conteo["Equipos"] > 0)]
+        counts[col] = conteo.sort_values("Etiqueta", ignore_index=True)
+    return Summary(len(df), counts)
+
+
+@st.cache_resource(max_entries=8)
+def get_summary(version, columns, _df, _keys=None):
+    """Resumen de la tabla, una vez por versión de datos y conjunto de columnas."""
+    return summarize(_df, columns, _keys)
+
+
+def web_counts(df_web, keys_web):
+    """{clave de Etiqueta: Equipos} de una hoja de resumen `Web`; vacío si no tiene esas columnas."""
+    if df_web.empty or "Etiqueta" not in df_web.columns or "Equipos" not in df_web.columns:
+        return {}
+    etiquetas = keys_web["Etiqueta"] if "Etiqueta" in keys_web.columns else key_column(df_web["Etiqueta"])
+    equipos = pd.to_numeric(df_web["Equipos"], errors="coerce").fillna(0)
+    return equipos.groupby(etiquetas.to_numpy(), sort=False).sum().astype(int).to_dict()
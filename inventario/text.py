@@ -0,0 +1,7 @@
+import unicodedata
+
+
+def normalize_text(s):
+    if s is None: return ""
+    s = str(s).strip().lower()
+    return "".join(ch for ch in unicodedata.normalize("NFKD", s) if not unicodedata.combining(ch))
@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from inventario.datasource import datasource_config
+
+logger = logging.getLogger(__name__)
+
+HISTORY = 200
+_SESSION_KEY = "_rerun_timer"
+
+
+@dataclass
+class Stage:
+    name: str
+    seconds: float = 0.0
+    rows_in: int | None = None
+    rows_out: int | None = None
+    bytes: int | None = None
+    measure: bool = field(default=False, repr=False)
+
+
+class RerunTimer:
+    """Tiempos de una ejecución del script, etapa por etapa.
+
+    Medir el tamaño de lo que se envía al navegador cuesta algo; solo se hace
+    (`measure`) cuando el panel de depuración o el registro JSONL están activos.
+    """
+
+    def __init__(self, page, log_path=None, measure=False):
+        self.page = page
+        self.log_path = log_path
+        self.measure = measure
+        self.stages = []
+        self.started = time.perf_counter()
+        self.total = None
+
+    def as_record(self):
+        return {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "page": self.page,
+            "total_s": self.total,
+            "stages": [{k: v for k, v in asdict(s).items() if k != "measure"} for s in self.stages],
+        }
+
+
+_history = defaultdict(lambda: deque(maxlen=HISTORY))
+_lock = threading.Lock()
+
+
+def timing_log_path():
+    """Archivo JSONL donde se agrega cada ejecución; INVENTARIO_TIMING_LOG tiene prioridad."""
+    if "INVENTARIO_TIMING_LOG" in os.environ:
+        return os.environ["INVENTARIO_TIMING_LOG"]
+    return datasource_config().get("timing_log", "")
+
+
+def start_rerun(page):
+    log_path = timing_log_path()
+    timer = RerunTimer(page, log_path, measure=bool(log_path) or "debug" in st.query_params)
+    st.session_state[_SESSION_KEY] = timer
+    return timer
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Mide el bloque como etapa de la ejecución actual; sin temporizador no registra nada."""
+    timer = st.session_state.get(_SESSION_KEY)
+    record = Stage(name, rows_in=rows_in, measure=timer is not None and timer.measure)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - start
+        if timer is not None:
+            timer.stages.append(record)
+
+
+@contextmanager
+def fragment_run(name):
+    """Mide un fragmento: dentro de una ejecución completa sus etapas se suman a
+    ella; cuando se vuelve a ejecutar solo, registra su propia ejecución `name`."""
+    if st.session_state.get(_SESSION_KEY) is not None:
+        yield
+        return
+    start_rerun(name)
+    try:
+        yield
+    except BaseException:
+        st.session_state.pop(_SESSION_KEY, None)
+        raise
+    finish_rerun()
+
+
+def payload_bytes(value):
+    """Tamaño aproximado de lo que viaja al navegador (JSON de tablas y figuras, o texto)."""
+    if isinstance(value, pd.DataFrame):
+        return len(value.to_json(orient="records"))
+    if hasattr(value, "to_json"):
+        return len(value.to_json())
+    return len(str(value).encode())
+
+
+def _append_log(path, record):
+    try:
+        with _lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError:
+        logger.warning("No se pudo escribir el registro de tiempos en %s", path, exc_info=True)
+
+
+def finish_rerun():
+    """Cierra la ejecución: la guarda en el historial, en el JSONL y, con ?debug, muestra el panel."""
+    timer = st.session_state.pop(_SESSION_KEY, None)
+    if timer is None:
+        return
+    timer.total = time.perf_counter() - timer.started
+    record = timer.as_record()
+    with _lock:
+        _history[timer.page].append(record)
+    if timer.log_path:
+        _append_log(timer.log_path, record)
+    if "debug" in st.query_params:
+        render_timings(timer)
+
+
+def _percentiles(page):
+    with _lock:
+        records = list(_history[page])
+    por_etapa = defaultdict(list)
+    for record in records:
+        por_etapa["total"].append(record["total_s"])
+        for s in record["stages"]:
+            por_etapa[s["name"]].append(s["seconds"])
+    return len(records), {
+        name: (np.percentile(v, 50) * 1000, np.percentile(v, 95) * 1000) for name, v in por_etapa.items()
+    }
+
+
+def render_timings(timer):
+    n, percentiles = _percentiles(timer.page)
+    filas = [
+        {
+            "Etapa": s.name,
+            "ms": round(s.seconds * 1000, 1),
+            "Filas entrada": s.rows_in,
+            "Filas salida": s.rows_out,
+            "KB enviados": None if s.bytes is None else round(s.bytes / 1024, 1),
+            "p50 ms": round(percentiles.get(s.name, (0, 0))[0], 1),
+            "p95 ms": round(percentiles.get(s.name, (0, 0))[1], 1),
+        }
+        for s in timer.stages
+    ]
+    p50, p95 = percentiles["total"]
+    with st.expander(f"⏱ Ejecución: {timer.total * 1000:.0f} ms (p50 {p50:.0f} ms · p95 {p95:.0f} ms en {n} ejecuciones)"):
+        st.dataframe(pd.DataFrame(filas), hide_index=True, use_container_width=True)
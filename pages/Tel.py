@@ -1,15 +1,21 @@
 import pandas as pd
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
 import base64
-import unicodedata
-import plotly.graph_objects as go
-import plotly.express as px
-import re 
+from inventario.datasource import COMPUTO, TELEFONOS, summary_override
+from inventario.refresh import get_refresher, render_freshness
+from inventario.facets import count, get_facet_index, intersect
+from inventario.changes import render_changes
+from inventario.charts import crear_area, crear_medidor
+from inventario.figures import render_figure_stats
+from inventario.grid import render_paged_grid
+from inventario.parsing import get_numeric_column
+from inventario.search import search_help, search_rows
+from inventario.summary import get_summary, web_counts
+from inventario.schema import COLUMNAS_TELEFONOS, render_schema_report, resolve_schema, search_fields
+from inventario.timing import finish_rerun, fragment_run, payload_bytes, stage, start_rerun
 
 st.set_page_config(page_title="Equipos Telefónicos", layout="wide")
+start_rerun("pages/Tel.py")
 
 st.markdown("""
 <style> 
@@ -44,92 +50,34 @@ with menu2:
     if st.button("📱Equipos teléfonicos", use_container_width=True):
         st.rerun()
 
-def crear_medidor(valor, titulo, color_barra):
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number",
-        value = valor,
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        number = {'suffix': "%", 'font': {'size': 36}, 'valueformat': '.1f'},
-        title = {'text': titulo, 'font': {'size': 16}},
-        gauge = {
-            'axis': {'range': [None, 100], 'visible': False},
-            'bar': {'color': color_barra, 'thickness': 0.8},
-            'bgcolor': "#2E2E2E",
-            'borderwidth': 2,
-            'bordercolor': "gray"
-        }
-    ))
-    fig.update_layout(
-        height=150,
-        margin=dict(l=10, r=10, t=40, b=10),
-        paper_bgcolor="rgba(0,0,0,0)", 
-        font={'color': "white"}
-    )
-    return fig
-
-SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1hUDaaqzQ_LKT71YTTwwyRYvvg1itNm46Dhezlz-5Jdk/edit"
-SHEET_TABLE = "Hoja 1" 
-SHEET_GAUGES = "Web"
-
-@st.cache_data(ttl=300)
 def load_all_data():
     try:
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive.readonly"]
-        creds_dict = st.secrets["gcp_service_account"]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-        client = gspread.authorize(creds)
-        spreadsheet = client.open_by_url(SPREADSHEET_URL)
-
-        ws_table = spreadsheet.worksheet(SHEET_TABLE)
-        values = ws_table.get_all_values()
-        if not values or len(values) <= 3:
-            df_table = pd.DataFrame()
-        else:
-            header_row_index = 3
-            raw_headers = values[header_row_index]
-            headers = [h if str(h).strip() != "" else f"col{i}" for i, h in enumerate(raw_headers)]
-            data = values[header_row_index + 1:]
-            df_table = pd.DataFrame(data, columns=headers).fillna("").astype(str)
-
-        ws_gauges = spreadsheet.worksheet(SHEET_GAUGES)
-        df_gauges = pd.DataFrame(ws_gauges.get_all_records())
-        if 'Equipos' in df_gauges.columns:
-            df_gauges['Equipos'] = pd.to_numeric(df_gauges['Equipos'], errors='coerce').fillna(0)
-
-        return df_table, df_gauges
-    
+        snapshot = get_refresher(TELEFONOS.key).get()
+        frames = snapshot.frames
+        return frames["table"], frames["table_keys"], frames["gauges"], frames["gauges_keys"], snapshot.version
     except Exception as e:
-        st.error(f"Error al conectar con Google Sheets: {e}")
-        return pd.DataFrame(), pd.DataFrame()
-
-def normalize_text(s):
-    if s is None: return ""
-    s = str(s).strip().lower()
-    return "".join(ch for ch in unicodedata.normalize("NFKD", s) if not unicodedata.combining(ch))
-
-def parse_numeric_value(x):
-    """Convierte cadenas como '$1,200.50' o '1.200,50' a float; devuelve NaN si no puede."""
-    if pd.isna(x):
-        return float("nan")
-    s = str(x).strip()
-    if s == "" or s.upper() == "N/A":
-        return float("nan")
-    if '.' in s and ',' in s:
-        if s.rfind(',') > s.rfind('.'):
-            s = s.replace('.', '') 
-            s = s.replace(',', '.') 
-        else:
-            s = s.replace(',', '') 
-    else:
-        if ',' in s and '.' not in s:
-            s = s.replace(',', '.')
-    s = re.sub(r'[^\d\.\-]', '', s)
-    try:
-        return float(s)
-    except Exception:
-        return float("nan")
-
-df_table, df_gauges_data = load_all_data()
+        st.error(f"Error al cargar el inventario: {e}")
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), ""
+
+with stage("carga") as s:
+    df_table, df_table_keys, df_gauges_data, df_gauges_keys, data_version = load_all_data()
+    s.rows_out = len(df_table)
+render_freshness(get_refresher(TELEFONOS.key))
+
+with stage("resumen", rows_in=len(df_table)):
+    schema = resolve_schema(TELEFONOS.key, tuple(df_table.columns))
+    estatus_key = schema.get("Estatus")
+    campos = search_fields(TELEFONOS.key, schema)
+    resumen = get_summary(data_version, tuple(c for c in (estatus_key, "Estado") if c), df_table, df_table_keys)
+    valores = {
+        "TOTAL": resumen.total_of(estatus_key),
+        "ACTIVOS": resumen.count(estatus_key, "ACTIVA"),
+        "DISPONIBLES": resumen.count(estatus_key, "DISPONIBLE"),
+        "BAJA": resumen.count(estatus_key, "BAJA"),
+    }
+    if summary_override():
+        conteo_web = web_counts(df_gauges_data, df_gauges_keys)
+        valores.update({k: v for k, v in conteo_web.items() if k in valores})
 
 st.markdown(
     "<p style='margin-left:18px;'>Resumen de líneas ACTIVAS</p>",
@@ -139,36 +87,15 @@ col1, col2, col3 = st.columns([2, 3, 2])
 with col2:
     if not df_table.empty and 'Estado' in df_table.columns:
         try:
-            df_estados = df_table[df_table['Estado'].astype(str).str.strip().str.upper().ne("TOTAL")]
-            df_estados = df_estados[df_estados['Estado'].astype(str).str.strip() != ""]
-
-            df_chart_data = (
-                df_estados.groupby(['Estado'])
-                .size()
-                .reset_index(name='Equipos por Estado')
-                .sort_values(by='Estado')
-            )
-
-            fig_area = px.area(
-                df_chart_data,
-                x='Estado',
-                y='Equipos por Estado',
-                title='Equipos por Estado',
-                labels={'Equipos por Estado': 'Número de Equipos', 'Estado': 'Estado'}
-            )
-
-            fig_area.update_traces(mode="lines", fill='tozeroy')
-            fig_area.update_layout(
-                height=490,
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font_color='white',
-                xaxis=dict(showgrid=False),
-                yaxis=dict(gridcolor='#444'),
-                showlegend=False
-            )
-
-            st.plotly_chart(fig_area, use_container_width=True, config={'displayModeBar': False})
+            with stage("grafico", rows_in=len(df_table)) as s:
+                df_chart_data = resumen.frame("Estado").rename(
+                    columns={"Etiqueta": "Estado", "Equipos": "Equipos por Estado"}
+                )
+                fig = crear_area(df_chart_data)
+                if s.measure:
+                    s.bytes = payload_bytes(fig)
+                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+                s.rows_out = len(df_chart_data)
 
         except Exception as e:
             st.error(f"No se pudo generar el gráfico: {e}")
@@ -177,64 +104,48 @@ with col2:
 
 
 with col3:
-    if not df_gauges_data.empty and 'Etiqueta' in df_gauges_data.columns and 'Equipos' in df_gauges_data.columns:
-        total_series = df_gauges_data[df_gauges_data['Etiqueta'].str.strip().str.upper() == 'TOTAL']['Equipos']
-        total = total_series.iloc[0] if not total_series.empty else 0
-
-        if total > 0:
-            metricas = {
-                "ACTIVOS": "#13C3E8",
-                "DISPONIBLES": "#28DE9E",
-                "BAJA": "#E68E8E"
-            }
-
-            for metrica, color in metricas.items():
-                valor_series = df_gauges_data[df_gauges_data['Etiqueta'].str.strip().str.upper() == metrica]['Equipos']
-                valor = valor_series.iloc[0] if not valor_series.empty else 0
-                
-                porcentaje = (valor / total) * 100
-                
+    total = valores["TOTAL"]
+
+    if total > 0:
+        metricas = {
+            "ACTIVOS": "#13C3E8",
+            "DISPONIBLES": "#28DE9E",
+            "BAJA": "#E68E8E"
+        }
+
+        for metrica, color in metricas.items():
+            porcentaje = (valores[metrica] / total) * 100
+
+            with stage("medidores") as s:
                 fig = crear_medidor(porcentaje, metrica.capitalize(), color)
+                if s.measure:
+                    s.bytes = payload_bytes(fig)
                 st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
-        else:
-            st.warning("El valor 'Total' en la hoja 'Web' es 0 o no se encontró.")
     else:
-        st.warning("Asegúrate que la hoja 'Web' tenga las columnas 'Etiqueta' y 'Equipos'.")
+        st.warning("No hay equipos en el inventario para calcular los porcentajes.")
 
-col_normal_map = {normalize_text(col): col for col in df_table.columns}
-estatus_key = None
-for key in ["estatus", "estado", "status"]:
-    if key in col_normal_map:
-        estatus_key = col_normal_map[key]
-        break
+with stage("facetas", rows_in=len(df_table)):
+    plan_col = schema.get("Costo del plan")
+    columnas_faceta = schema.columns(["Región", "Departamento", "Marca", "Modelo"])
+    facets = get_facet_index(data_version, tuple(c for c in [estatus_key, *columnas_faceta] if c), df_table, df_table_keys)
 
+df_table_completa = df_table
+activas = None
 if estatus_key:
-    mask_activa = df_table[estatus_key].astype(str).str.upper().str.strip() == "ACTIVA"
-    df_table = df_table[mask_activa]
+    activas = facets.rows(estatus_key, "ACTIVA")
 else:
     st.warning("No se encontró una columna con nombre 'ESTATUS' (o similar). No se aplicó filtro 'ACTIVA'.")
 
-plan_col = None
-normalized_to_real = {normalize_text(c): c for c in df_table.columns}
-target_norm = normalize_text("Plan Y Servicios contratados")
-if target_norm in normalized_to_real:
-    plan_col = normalized_to_real[target_norm]
-else:
-    for nreal, realcol in normalized_to_real.items():
-        if "plan" in nreal and "servici" in nreal:
-            plan_col = realcol
-            break
-    if plan_col is None:
-        for nreal, realcol in normalized_to_real.items():
-            if "plan" in nreal or "servici" in nreal or "servicios" in nreal:
-                plan_col = realcol
-                break
-
-otal_plan_servicios = None
+total_plan_servicios = None
 media_plan_servicios = None 
 
 if plan_col is not None:
-    numeric_series = df_table[plan_col].apply(parse_numeric_value).dropna()
+    with stage("costos", rows_in=len(df_table_completa)) as s:
+        numeric_series = get_numeric_column(data_version, plan_col, df_table_completa)
+        if activas is not None:
+            numeric_series = numeric_series.take(activas)
+        numeric_series = numeric_series.dropna()
+        s.rows_out = len(numeric_series)
     
     if not numeric_series.empty:
         total_plan_servicios = numeric_series.sum()
@@ -312,16 +223,7 @@ with col1:
         st.info("La hoja 'Web' no contiene las columnas 'Modelo' y 'Obsolecencia'.")
 
     st.markdown("# ")
-    activos = 0
-    if not df_gauges_data.empty and 'Etiqueta' in df_gauges_data.columns and 'Equipos' in df_gauges_data.columns:
-        activos_series = df_gauges_data[
-            df_gauges_data['Etiqueta'].astype(str).str.strip().str.upper() == 'ACTIVOS'
-        ]['Equipos']
-        if not activos_series.empty and pd.notna(activos_series.iloc[0]):
-            try:
-                activos = int(activos_series.iloc[0])
-            except Exception:
-                activos = int(pd.to_numeric(activos_series.iloc[0], errors='coerce')) if pd.notna(activos_series.iloc[0]) else 0
+    activos = valores["ACTIVOS"]
 
     st.markdown(
         f"""
@@ -335,56 +237,46 @@ with col1:
         unsafe_allow_html=True
     )
 
-columnas_deseadas = [
-    "Región", "Número de Teléfono", "Plan Y Servicios contratados", "Ciudad", "Estado",
-    "Empleado", "Puesto", "Departamento", "Marca", "Modelo", "IMEI", "N° SERIE"
-]
-
-normalized_to_real = {normalize_text(c): c for c in df_table.columns}
-matched_columns = []
-for desired in columnas_deseadas:
-    nd = normalize_text(desired)
-    if nd in normalized_to_real:
-        matched_columns.append(normalized_to_real[nd])
-    else:
-        for nreal, realcol in normalized_to_real.items():
-            if nd in nreal or nreal in nd:
-                matched_columns.append(realcol)
-                break
-
-matched_columns = list(dict.fromkeys(matched_columns))
+matched_columns = schema.columns(COLUMNAS_TELEFONOS)
 if len(matched_columns) == 0:
     st.info("No se encontraron coincidencias exactas para las columnas deseadas. Se mostrarán todas las columnas.")
     matched_columns = df_table.columns.tolist()
 
-df_filtrado = df_table[matched_columns].copy()
-
 st.markdown("# ")
-search_query = st.text_input("🔍 Buscar", placeholder="Escribe aquí para buscar...")
-
-if search_query:
-    search_series = df_filtrado.apply(lambda row: " ".join(row.values.astype(str)), axis=1)
-    mask = search_series.str.contains(search_query, case=False, na=False)
-    df_filtrado = df_filtrado[mask]
-
-gb = GridOptionsBuilder.from_dataframe(df_filtrado)
-gb.configure_default_column(editable=False, resizable=False, minWidth=80)
-gb.configure_selection(selection_mode="single", use_checkbox=False)
-gb.configure_grid_options(domLayout="normal", suppressHorizontalScroll=False, rowHeight=30)
-gridOptions = gb.build()
-
-custom_css = {
-    ".ag-root-wrapper": {"background-color": "transparent !important", "border": "1px solid #333e5d !important"},
-    ".ag-header, .ag-row, .ag-cell": {"background-color": "transparent !important", "color": "white !important", "border": "1px solid #333e5d !important", "font-size": "11px !important"},
-    ".ag-header-cell-text": {"color": "white !important", "font-weight": "bold !important"}
-}
-
-AgGrid(
-    df_filtrado, gridOptions=gridOptions, update_mode=GridUpdateMode.MODEL_CHANGED,
-    fit_columns_on_grid_load=False, allow_unsafe_jscode=False, theme="streamlit", height=700,
-    data_return_mode=DataReturnMode.FILTERED_AND_SORTED,
-    custom_css=custom_css
-)
-
-
 
+@st.fragment
+def seccion_tabla(df_table_completa, facets, activas, columnas_faceta, matched_columns, campos, data_version):
+    """Filtros, búsqueda y tabla: se vuelven a ejecutar sin tocar gráficas ni resúmenes."""
+    with fragment_run("pages/Tel.py#tabla"):
+        filtros = {col: st.session_state.get(f"faceta_{col}") for col in columnas_faceta}
+        if columnas_faceta:
+            for c, col in zip(st.columns(len(columnas_faceta)), columnas_faceta):
+                conteo = facets.counts_excluding(col, filtros, base=activas)
+                opciones = [None] + sorted(v for v in facets.values[col] if v)
+                # Las opciones no llevan conteos: el id del selectbox depende de sus etiquetas y, si cambiaran
+                # con los demás filtros, Streamlit descartaría la selección.
+                valor = c.selectbox(col, opciones, key=f"faceta_{col}", format_func=lambda v: "Todos" if v is None else v)
+                c.caption(f"{count(conteo, valor):,} líneas" if valor else f"{sum(conteo.values()):,} líneas en total")
+            filtros = {col: st.session_state.get(f"faceta_{col}") for col in columnas_faceta}
+
+        search_query = st.text_input("🔍 Buscar", placeholder="Escribe aquí para buscar...", help=search_help(campos))
+
+        with stage("filtro", rows_in=len(df_table_completa)) as s:
+            posiciones = intersect(activas, facets.select(filtros))
+            s.rows_out = len(df_table_completa) if posiciones is None else len(posiciones)
+
+        if search_query:
+            with stage("busqueda", rows_in=s.rows_out) as s:
+                encontrados = search_rows("tel", data_version, matched_columns, df_table_completa, search_query, campos)
+                posiciones = intersect(posiciones, encontrados)
+                s.rows_out = len(posiciones)
+
+        render_paged_grid(df_table_completa, posiciones, matched_columns, data_version, key="tabla_telefonos", export_name="lineas_telefonicas")
+
+seccion_tabla(df_table_completa, facets, activas, columnas_faceta, matched_columns, campos, data_version)
+render_changes(get_refresher(TELEFONOS.key).changes, "telefonos", estatus_key)
+
+render_figure_stats()
+render_schema_report(schema)
+finish_rerun()
+get_refresher(COMPUTO.key).prefetch()
@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventario.parsing import parse_numeric_series, parse_numeric_value
+
+CASOS = [
+    "$1,200.50", "1.200,50", "1,200.50", "1.200", "1,5", "1,2,3", "1.2.3", "$ 899", "649.90 MXN",
+    "-", ".", "-.", "-.5", "5.", "--5", "5-", "-$1,234.56", "  12  ", "\t7\n", "\x0b3\x0c",
+    "N/A", "n/a", "N/a", " n/A ", "NA", "", "   ", "abc", "1e5", "1E-3", "inf", "nan", "0", "-0", "-0.0",
+    "١٢٣", "１２３", "٣.٥", "12\x00", "\x1f5", "5\x7f", "1 200", "​42", "²", "½",
+    "1.200,50,00", "1,200.50.00", ",", ",5", "5,", "$", "$-", "(1,000)", "1 000,25",
+]
+
+
+def assert_same(esperado, obtenido):
+    esperado, obtenido = np.asarray(esperado, dtype=float), np.asarray(obtenido, dtype=float)
+    assert np.array_equal(esperado, obtenido, equal_nan=True)
+    assert np.array_equal(np.signbit(esperado), np.signbit(obtenido))
+
+
+def referencia(values):
+    return [parse_numeric_value(v) for v in values]
+
+
+@pytest.mark.parametrize("value", CASOS)
+def test_caso_igual_a_la_referencia(value):
+    assert_same([parse_numeric_value(value)], parse_numeric_series(pd.Series([value], dtype=object)))
+
+
+def test_nulos_y_tipos_mezclados():
+    values = [None, np.nan, pd.NA, 1200, 3.5, -0.0, "1,5", "N/A"]
+    assert_same(referencia(values), parse_numeric_series(pd.Series(values, dtype=object)))
+
+
+def _fuzz(rng, n):
+    alfabeto = "0123456789.,-$ \tNA/naMXé١２\x00\x0b "
+    values = ["".join(rng.choice(alfabeto) for _ in range(rng.randint(0, 10))) for _ in range(n)]
+    values += [f"{rng.uniform(-1e6, 1e6):,.{rng.randint(0, 3)}f}" for _ in range(n // 4)]
+    values += [f"{rng.uniform(0, 1e6):,.2f}".replace(",", "_").replace(".", ",").replace("_", ".") for _ in range(n // 4)]
+    return values
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_fuzz_igual_a_la_referencia(seed):
+    values = _fuzz(random.Random(seed), 5000)
+    assert_same(referencia(values), parse_numeric_series(pd.Series(values, dtype=object)))
+
+
+def test_fuzz_categorica_y_cadenas_de_arrow():
+    values = _fuzz(random.Random(3), 2000) + CASOS
+    for dtype in ("category", pd.StringDtype("pyarrow")):
+        serie = pd.Series(values, dtype=dtype, index=range(10, 10 + len(values)), name="Plan")
+        obtenido = parse_numeric_series(serie)
+        assert_same(referencia(serie.tolist()), obtenido)
+        assert obtenido.index.equals(serie.index) and obtenido.name == "Plan"
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from bench.load_test import write_mirror
+from bench.synthetic import make_hoja1
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def tel(tmp_path, monkeypatch):
+    write_mirror(str(tmp_path), 2000, 0)
+    monkeypatch.setenv("INVENTARIO_BACKEND", "csv")
+    monkeypatch.setenv("INVENTARIO_DATA_PATH", str(tmp_path))
+    monkeypatch.setenv("INVENTARIO_SNAPSHOT_DIR", "")
+    monkeypatch.chdir(ROOT_DIR)
+    at = AppTest.from_file(os.path.join(ROOT_DIR, "pages", "Tel.py"), default_timeout=60)
+    at.run()
+    assert not at.exception
+    return at
+
+
+def _filas(at):
+    texto = next(m.value for m in at.markdown if "Filas " in m.value)
+    return int(texto.split(" de ")[-1].split("<")[0].replace(",", ""))
+
+
+def test_dos_facetas_se_conservan(tel):
+    hoja1 = make_hoja1(2000, 0)
+    esperado = int((
+        (hoja1["ESTATUS"].str.strip().str.upper() == "ACTIVA")
+        & (hoja1["Marca"].str.upper() == "APPLE")
+        & (hoja1["Región"].str.upper() == "NORTE")
+    ).sum())
+
+    tel.selectbox(key="faceta_Marca").select("APPLE").run()
+    tel.selectbox(key="faceta_Región").select("NORTE").run()
+    for _ in range(2):
+        assert tel.selectbox(key="faceta_Marca").value == "APPLE"
+        assert tel.selectbox(key="faceta_Región").value == "NORTE"
+        assert _filas(tel) == esperado
+        tel.text_input[0].input("").run()
+        assert not tel.exception